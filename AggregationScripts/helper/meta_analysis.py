@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+GROUP_ORDER = ["Commit", "File-Level", "Pull Requests", "Other"]
+
+
+def standard_error_from_ci(ci_lower, ci_upper, alpha=0.05):
+    """
+    Approximate the standard error of an estimate from its (1 - alpha) confidence interval.
+
+    Parameters:
+        ci_lower (array-like): The lower bounds (e.g. of calculate_cliffs_delta_with_confidence).
+        ci_upper (array-like): The upper bounds.
+        alpha (float): The significance level of the intervals.
+
+    Returns:
+        np.ndarray: (ci_upper - ci_lower) / (2 * z_(1 - alpha/2)).
+    """
+    from scipy.stats import norm
+
+    return (np.asarray(ci_upper, dtype=float) - np.asarray(ci_lower, dtype=float)) / (2 * norm.ppf(1 - alpha / 2))
+
+
+def random_effects_meta_analysis(results_df, metric_column='metric', effect_column='effect_size', ci_lower_column='ci_lower',
+                                 ci_upper_column='ci_upper', alpha=0.05):
+    """
+    Pool the per-repository/participant effect sizes of every metric with an inverse-variance random-effects model
+    (DerSimonian-Laird). All metrics are pooled in one vectorized computation over the consolidated table
+    (helper.results.load_metric_results).
+
+    The variances are derived from the confidence intervals (standard_error_from_ci). Rows without an effect
+    size or with a zero-width interval (e.g. only empty buckets) have no finite weight and are left out.
+
+    Parameters:
+        results_df (pd.DataFrame): One row per metric and repository/participant.
+        metric_column (str): The column identifying the metric.
+        effect_column (str): The effect sizes (Cliff's Delta).
+        ci_lower_column (str): The lower confidence bounds.
+        ci_upper_column (str): The upper confidence bounds.
+        alpha (float): The significance level of the input intervals and of the pooled intervals.
+
+    Returns:
+        pd.DataFrame: One row per metric with k (the pooled rows), fixed_effect, pooled_effect, se, ci_lower,
+        ci_upper, z, p_value, significant, tau2 (between-study variance), Q (Cochran's Q) and I2 (in percent).
+    """
+    from scipy.stats import norm
+
+    effect = results_df[effect_column].to_numpy(dtype=float) if effect_column in results_df else np.full(len(results_df), np.nan)
+    if ci_lower_column in results_df and ci_upper_column in results_df:
+        variance = standard_error_from_ci(results_df[ci_lower_column], results_df[ci_upper_column], alpha) ** 2
+    else:
+        variance = np.full(len(results_df), np.nan)
+    codes, metrics = pd.factorize(results_df[metric_column], sort=True)
+    n_metrics = len(metrics)
+
+    valid = ~np.isnan(effect) & np.isfinite(variance) & (variance > 0) & (codes >= 0)
+    codes, effect, variance = codes[valid], effect[valid], variance[valid]
+
+    def per_metric(values):
+        return np.bincount(codes, weights=values, minlength=n_metrics)
+
+    k = np.bincount(codes, minlength=n_metrics)
+    weight = 1 / variance
+    sum_w = per_metric(weight)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fixed_effect = per_metric(weight * effect) / sum_w
+
+        # Cochran's Q and the DerSimonian-Laird between-study variance
+        q = per_metric(weight * (effect - fixed_effect[codes]) ** 2)
+        c = sum_w - per_metric(weight ** 2) / sum_w
+        tau2 = np.where(k > 1, np.maximum(0, (q - (k - 1)) / c), 0.0)
+        i2 = np.where(q > 0, np.maximum(0, (q - (k - 1)) / q) * 100, 0.0)
+
+        random_weight = 1 / (variance + tau2[codes])
+        sum_random_w = per_metric(random_weight)
+        pooled = per_metric(random_weight * effect) / sum_random_w
+        se = np.sqrt(1 / sum_random_w)
+        z = pooled / se
+    z_critical = norm.ppf(1 - alpha / 2)
+    p_value = 2 * norm.sf(np.abs(z))
+
+    pooled_df = pd.DataFrame({
+        metric_column: metrics,
+        'k': k,
+        'fixed_effect': fixed_effect,
+        'pooled_effect': pooled,
+        'se': se,
+        'ci_lower': pooled - z_critical * se,
+        'ci_upper': pooled + z_critical * se,
+        'z': z,
+        'p_value': p_value,
+        'significant': p_value < alpha,
+        'tau2': np.where(k > 0, tau2, np.nan),
+        'Q': np.where(k > 0, q, np.nan),
+        'I2': np.where(k > 0, i2, np.nan),
+    })
+    return pooled_df
+
+
+def add_metric_groups(df, metric_mapping, metric_column='metric'):
+    """
+    Add the 'label' and 'group' of metric_mapping.json to a table with one row per metric and sort it like the
+    heatmaps (by group in GROUP_ORDER, then by label). Metrics missing in the mapping keep their name in group 'Other'.
+
+    Parameters:
+        df (pd.DataFrame): The table, e.g. the output of random_effects_meta_analysis.
+        metric_mapping (dict): The content of metric_mapping.json.
+        metric_column (str): The column with the metric names.
+
+    Returns:
+        pd.DataFrame: The table with the columns label and group after the metric column.
+    """
+    df = df.copy()
+    position = df.columns.get_loc(metric_column) + 1
+    df.insert(position, 'label', [metric_mapping.get(metric, {}).get('label', metric) for metric in df[metric_column]])
+    df.insert(position + 1, 'group', [metric_mapping.get(metric, {}).get('group', 'Other') for metric in df[metric_column]])
+    group_rank = df['group'].map(lambda group: GROUP_ORDER.index(group) if group in GROUP_ORDER else len(GROUP_ORDER))
+    return df.assign(_group_rank=group_rank).sort_values(['_group_rank', 'label'], kind='stable').drop(columns='_group_rank').reset_index(drop=True)
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+CORRECTION_METHODS = ['holm', 'fdr_bh', 'bonferroni']
+
+
+def adjust_p_values(p_values, method='holm'):
+    """
+    Adjust p-values for multiple comparisons in one vectorized pass.
+
+    NaN p-values (e.g. metrics without a significance test) are ignored and stay NaN;
+    the number of comparisons is the number of non-NaN p-values.
+
+    Parameters:
+        p_values (array-like): The raw p-values of all comparisons.
+        method (str): 'holm' (Holm-Bonferroni), 'fdr_bh' (Benjamini-Hochberg) or 'bonferroni'.
+
+    Returns:
+        np.ndarray: The adjusted p-values in the order of the input.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p_values.shape, np.nan)
+
+    valid = ~np.isnan(p_values)
+    p = p_values[valid]
+    m = len(p)
+    if m == 0:
+        return adjusted
+
+    if method == 'bonferroni':
+        adjusted[valid] = np.minimum(p * m, 1.0)
+        return adjusted
+
+    order = np.argsort(p, kind='stable')
+    p_sorted = p[order]
+    ranks = np.arange(1, m + 1)
+
+    if method == 'holm':
+        # Step-down: multiply the i-th smallest p-value by (m - i + 1) and keep the result monotone
+        adjusted_sorted = np.maximum.accumulate((m - ranks + 1) * p_sorted)
+    elif method == 'fdr_bh':
+        # Step-up: multiply the i-th smallest p-value by m / i and keep the result monotone from the top
+        adjusted_sorted = np.minimum.accumulate((p_sorted * m / ranks)[::-1])[::-1]
+    else:
+        raise ValueError(f"Unknown correction method: {method}. Use one of {CORRECTION_METHODS}.")
+
+    corrected = np.empty(m)
+    corrected[order] = np.minimum(adjusted_sorted, 1.0)
+    adjusted[valid] = corrected
+    return adjusted
+
+
+def apply_multiple_comparison_correction(results_df, p_value_column='p_value', methods=CORRECTION_METHODS, primary_method='holm', alpha=0.05, family_column=None):
+    """
+    Add adjusted p-values and a significant_adj flag to a consolidated results table.
+
+    By default the whole table (all metrics x all repositories/participants) is one family
+    of comparisons. With family_column (e.g. 'metric'), each group is corrected separately.
+
+    Parameters:
+        results_df (pd.DataFrame): The consolidated results, e.g. from load_metric_results.
+        p_value_column (str): The column containing the raw p-values.
+        methods (list): The correction methods to apply; each adds a column p_value_{method}.
+        primary_method (str): The method used for the significant_adj flag.
+        alpha (float): The family-wise error rate (Holm, Bonferroni) or false discovery rate (BH).
+        family_column (str): Optional column defining separate families of comparisons.
+
+    Returns:
+        pd.DataFrame: A copy of results_df with the adjusted p-values and significant_adj.
+    """
+    results_df = results_df.copy()
+    if p_value_column in results_df.columns:
+        p_values = pd.to_numeric(results_df[p_value_column], errors='coerce').to_numpy(dtype=float)
+    else:
+        p_values = np.full(len(results_df), np.nan)
+
+    if primary_method not in methods:
+        methods = list(methods) + [primary_method]
+
+    for method in methods:
+        if family_column is None:
+            results_df[f'{p_value_column}_{method}'] = adjust_p_values(p_values, method)
+        else:
+            adjusted = np.full(len(results_df), np.nan)
+            for positions in results_df.groupby(family_column, sort=False).indices.values():
+                adjusted[positions] = adjust_p_values(p_values[positions], method)
+            results_df[f'{p_value_column}_{method}'] = adjusted
+
+    primary = results_df[f'{p_value_column}_{primary_method}']
+    results_df['significant_adj'] = (primary < alpha).where(primary.notna())
+    return results_df
+
+
+def write_adjusted_results(results_df, p_value_column='p_value'):
+    """
+    Write the adjusted p-values and significant_adj flags back into the metric CSVs.
+
+    The new columns are placed directly after the effect size columns (effect_size, ci_lower,
+    ci_upper) of each file. Rows are matched via the 'source_file' and 'source_row' columns
+    added by load_metric_results, so no test has to be re-run.
+
+    Parameters:
+        results_df (pd.DataFrame): The output of apply_multiple_comparison_correction.
+        p_value_column (str): The column containing the raw p-values.
+    """
+    adjusted_columns = [col for col in results_df.columns if col.startswith(f'{p_value_column}_')] + ['significant_adj']
+
+    for file, file_results in results_df.groupby('source_file', sort=False):
+        df = pd.read_csv(file, index_col=0)
+        if p_value_column not in df.columns:
+            # Effect-size only results (Cliff's Delta) have nothing to adjust
+            continue
+        df = df.drop(columns=[col for col in adjusted_columns if col in df.columns])
+
+        adjusted = file_results.set_index('source_row')[adjusted_columns]
+        effect_columns = [col for col in ['effect_size', 'ci_lower', 'ci_upper'] if col in df.columns]
+        position = df.columns.get_loc(effect_columns[-1]) + 1 if effect_columns else len(df.columns)
+
+        for offset, col in enumerate(adjusted_columns):
+            df.insert(position + offset, col, adjusted[col].reindex(df.index))
+
+        df.to_csv(file)
+        print(f"Wrote adjusted p-values to {file}")
@@ -0,0 +1,254 @@
+"""
+Monte-Carlo power analysis for the choice of BUCKET_SIZE.
+
+The null distribution of a metric at a bucket size is the pool of its pre-introduction buckets in
+RESULTS_DIRECTORY/metric_calculation_{BUCKET_SIZE}/*.csv (load_bucket_distributions). Every simulated dataset
+draws n pre and n post buckets from this pool, injects a synthetic effect into the post buckets and runs the
+tests of the analysis notebooks: Mann-Whitney U (independent), Wilcoxon signed-rank (pre-i paired with post-i)
+and Cliff's Delta. A simulation chunk is one (simulations x buckets) matrix per side and every test runs on the
+whole matrix (split only where scipy would pick a different method for a single row); the chunks of all
+configurations are spread over worker processes.
+
+    distributions = load_bucket_distributions(RESULTS_DIRECTORY)
+    power = power_analysis(distributions, effects=[0, 0.1, 0.25, 0.5], n_simulations=20000)
+"""
+import multiprocessing
+import os
+import re
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+
+import numpy as np
+import pandas as pd
+
+from helper.results import metric_name_from_path
+
+TESTS = ['mann_whitney', 'wilcoxon', 'cliffs_delta']
+EFFECT_TYPES = ['multiplicative', 'additive']
+
+
+def load_bucket_distributions(results_directory, metrics=None):
+    """
+    Collect the pre-introduction bucket values of every metric and bucket size.
+
+    Parameters:
+        results_directory (str): The RESULTS_DIRECTORY containing metric_calculation_{BUCKET_SIZE} directories.
+        metrics (list): The normalized metric names to load (default: all).
+
+    Returns:
+        dict: (metric, bucket_size) -> {'values': the non-missing pre buckets of all repositories,
+        'n_buckets': the number of pre buckets per repository in the output}.
+    """
+    distributions = {}
+    for directory in sorted(glob(os.path.join(results_directory, 'metric_calculation_*'))):
+        match = re.search(r'metric_calculation_(\d+)$', directory)
+        if not match:
+            continue
+        bucket_size = int(match.group(1))
+        for file in sorted(glob(os.path.join(directory, '*.csv'))):
+            metric = metric_name_from_path(file)
+            if metrics is not None and metric not in metrics:
+                continue
+            df = pd.read_csv(file, index_col=0)
+            pre_columns = [col for col in df.columns if col.startswith('pre-')]
+            values = df[pre_columns].to_numpy(dtype=float).ravel()
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+            distributions[(metric, bucket_size)] = {'values': values, 'n_buckets': len(pre_columns)}
+    return distributions
+
+
+def cliffs_delta_interval(pre, post, alpha=0.05):
+    """
+    Cliff's Delta (positive if the post values are higher) with Cliff's asymmetric confidence interval for every row.
+
+    The interval uses the consistent variance estimator of Cliff (1993) instead of the bootstrap of
+    calculate_cliffs_delta_with_confidence, which would multiply the cost of a simulation by the resamples.
+
+    Parameters:
+        pre (np.ndarray): The pre values, shape (rows, n1).
+        post (np.ndarray): The post values, shape (rows, n2).
+        alpha (float): The significance level.
+
+    Returns:
+        tuple: The deltas, the lower and the upper bounds (arrays of length rows).
+    """
+    from scipy.stats import norm
+
+    n1, n2 = pre.shape[1], post.shape[1]
+    dominance = np.sign(post[:, None, :] - pre[:, :, None])  # (rows, n1, n2)
+    delta = dominance.mean(axis=(1, 2))
+    centered = dominance - delta[:, None, None]
+    row_deviation = ((dominance.mean(axis=2) - delta[:, None]) ** 2).sum(axis=1)
+    column_deviation = ((dominance.mean(axis=1) - delta[:, None]) ** 2).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (n2 ** 2 * row_deviation + n1 ** 2 * column_deviation - (centered ** 2).sum(axis=(1, 2))) / (n1 * n2 * (n1 - 1) * (n2 - 1))
+        # Cliff's lower bound of the variance keeps the interval from collapsing for extreme deltas
+        variance = np.maximum(variance, (1 - delta ** 2) / (n1 * n2 - 1))
+        z = norm.ppf(1 - alpha / 2)
+        s = np.sqrt(variance)
+        root = z * s * np.sqrt((1 - delta ** 2) ** 2 + z ** 2 * variance)
+        denominator = 1 - delta ** 2 + z ** 2 * variance
+        lower = (delta - delta ** 3 - root) / denominator
+        upper = (delta - delta ** 3 + root) / denominator
+    return delta, np.clip(lower, -1, 1), np.clip(upper, -1, 1)
+
+
+def _has_ties(values):
+    # Rows with a repeated value; scipy checks this once for the whole array, not per row
+    ordered = np.sort(values, axis=1)
+    return (np.diff(ordered, axis=1) == 0).any(axis=1)
+
+
+def mann_whitney_p_values(pre, post):
+    """
+    Two-sided Mann-Whitney U p-values of every row, as scipy's mannwhitneyu(method='auto') for a single row.
+
+    scipy chooses between the exact and the asymptotic test once per call, so rows with and without ties are
+    tested in separate calls.
+    """
+    from scipy.stats import mannwhitneyu
+
+    p_values = np.full(len(pre), np.nan)
+    ties = _has_ties(np.hstack([pre, post]))
+    for rows in (ties, ~ties):
+        if rows.any():
+            p_values[rows] = mannwhitneyu(pre[rows], post[rows], axis=1, alternative='two-sided', method='auto').pvalue
+    return p_values
+
+
+def wilcoxon_p_values(pre, post):
+    """
+    Two-sided Wilcoxon signed-rank p-values of every row (pre-i paired with post-i), as scipy's wilcoxon for a
+    single row: exact without ties and zero differences, otherwise exact over all sign flips for up to 13 pairs
+    (scipy's permutation test, enumerated here as one matrix product) and asymptotic above.
+    """
+    from scipy.stats import rankdata, wilcoxon
+
+    differences = pre - post
+    n = differences.shape[1]
+    p_values = np.full(len(differences), np.nan)
+    ties = _has_ties(np.abs(differences)) | (differences == 0).any(axis=1)
+    if (~ties).any():
+        p_values[~ties] = wilcoxon(pre[~ties], post[~ties], axis=1, method='exact' if n <= 50 else 'asymptotic').pvalue
+    if ties.any() and n > 13:
+        p_values[ties] = wilcoxon(pre[ties], post[ties], axis=1, method='asymptotic').pvalue
+    elif ties.any():
+        # Ranks of the non-zero differences (zeros get rank 0 and do not change the statistic when flipped)
+        d = differences[ties]
+        ranks = np.nan_to_num(rankdata(np.where(d == 0, np.nan, np.abs(d)), axis=1, nan_policy='omit'))
+        observed = np.where(d > 0, ranks, 0).sum(axis=1)
+        flips = (np.arange(2 ** n)[:, None] >> np.arange(n)[None, :]) & 1
+        tie_p = np.empty(len(d))
+        step = max(1, 2 ** 22 // 2 ** n)
+        for start in range(0, len(d), step):
+            null = ranks[start:start + step] @ flips.T  # (rows, 2 ** n) statistics under all sign flips
+            stat = observed[start:start + step, None]
+            greater = (null >= stat - 1e-9).mean(axis=1)
+            less = (null <= stat + 1e-9).mean(axis=1)
+            tie_p[start:start + step] = np.minimum(1, 2 * np.minimum(greater, less))
+        # Only zero differences: the test is undefined
+        tie_p[(d == 0).all(axis=1)] = np.nan
+        p_values[ties] = tie_p
+    return p_values
+
+
+def _simulate_chunk(task):
+    """
+    Run one chunk of simulations of one configuration and return the number of rejections per test.
+    """
+    values, n_buckets, effect, effect_type, alpha, size, seed = task
+    rng = np.random.default_rng(seed)
+    pre = rng.choice(values, size=(size, n_buckets))
+    post = rng.choice(values, size=(size, n_buckets))
+    if effect_type == 'multiplicative':
+        post = post * (1 + effect)
+    elif effect_type == 'additive':
+        post = post + effect * values.std(ddof=1)
+    else:
+        raise ValueError(f"Unknown effect type '{effect_type}', expected one of {EFFECT_TYPES}.")
+
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        # Constant samples (e.g. only empty buckets) make the tests undefined; they count as not significant
+        warnings.simplefilter('ignore')
+        mann_whitney_p = mann_whitney_p_values(pre, post)
+        wilcoxon_p = wilcoxon_p_values(pre, post)
+    delta, lower, upper = cliffs_delta_interval(pre, post, alpha)
+
+    return {
+        'mann_whitney': int(np.sum(mann_whitney_p < alpha)),
+        'wilcoxon': int(np.sum(wilcoxon_p < alpha)),
+        'cliffs_delta': int(np.sum((lower > 0) | (upper < 0))),
+        'delta_sum': float(np.nansum(delta)),
+        'size': size,
+    }
+
+
+def power_analysis(distributions, effects, n_buckets=None, n_simulations=10000, effect_type='multiplicative', alpha=0.05,
+                   seed=None, processes=None, chunk_size=2000):
+    """
+    Estimate the power of the Mann-Whitney U test, the Wilcoxon signed-rank test and Cliff's Delta for every
+    metric, bucket size, number of buckets and synthetic effect.
+
+    Parameters:
+        distributions (dict): The output of load_bucket_distributions.
+        effects (list): The injected effects; relative changes of the post buckets for 'multiplicative'
+            (0.25 = 25 % more), multiples of the pooled standard deviation for 'additive'. Effect 0 gives the type I error.
+        n_buckets (list or dict): The numbers of buckets per side to simulate; a dict maps a bucket size to its list.
+            Default: the number of pre buckets in the outputs of each bucket size.
+        n_simulations (int): The simulated datasets per configuration.
+        effect_type (str): 'multiplicative' or 'additive'.
+        alpha (float): The significance level of all tests.
+        seed (int): The seed; the results do not depend on the number of processes.
+        processes (int): The number of worker processes (defaults to the number of CPUs). With 0, all chunks run
+            in the calling process.
+        chunk_size (int): The simulations per vectorized chunk (bounds the memory of Cliff's Delta).
+
+    Returns:
+        pd.DataFrame: One row per metric, bucket_size, n_buckets and effect with the share of significant results
+        per test (power_mann_whitney, power_wilcoxon, power_cliffs_delta) and the mean Cliff's Delta.
+    """
+    configurations = []
+    for (metric, bucket_size), distribution in sorted(distributions.items()):
+        if n_buckets is None:
+            sizes = [distribution['n_buckets']]
+        elif isinstance(n_buckets, dict):
+            sizes = n_buckets.get(bucket_size, [distribution['n_buckets']])
+        else:
+            sizes = n_buckets
+        for size in sizes:
+            for effect in effects:
+                configurations.append((metric, bucket_size, int(size), float(effect), distribution['values']))
+
+    # One independent seed per configuration and chunk, so the results do not depend on the scheduling
+    seeds = np.random.SeedSequence(seed).spawn(len(configurations))
+    tasks, owners = [], []
+    for index, (_, _, size, effect, values) in enumerate(configurations):
+        chunk_sizes = [min(chunk_size, n_simulations - start) for start in range(0, n_simulations, chunk_size)]
+        for chunk_seed, simulations in zip(seeds[index].spawn(len(chunk_sizes)), chunk_sizes):
+            tasks.append((values, size, effect, effect_type, alpha, simulations, chunk_seed))
+            owners.append(index)
+
+    if processes == 0 or len(tasks) <= 1:
+        outcomes = [_simulate_chunk(task) for task in tasks]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+            outcomes = list(executor.map(_simulate_chunk, tasks, chunksize=max(1, len(tasks) // (4 * (processes or os.cpu_count() or 1)))))
+
+    totals = [{'mann_whitney': 0, 'wilcoxon': 0, 'cliffs_delta': 0, 'delta_sum': 0.0, 'size': 0} for _ in configurations]
+    for index, outcome in zip(owners, outcomes):
+        for key, value in outcome.items():
+            totals[index][key] += value
+
+    rows = []
+    for (metric, bucket_size, size, effect, _), total in zip(configurations, totals):
+        row = {'metric': metric, 'bucket_size': bucket_size, 'n_buckets': size, 'effect': effect, 'simulations': total['size']}
+        for test in TESTS:
+            row[f'power_{test}'] = total[test] / total['size'] if total['size'] else np.nan
+        row['mean_cliffs_delta'] = total['delta_sum'] / total['size'] if total['size'] else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['metric', 'bucket_size', 'n_buckets', 'effect', 'simulations']
+                        + [f'power_{test}' for test in TESTS] + ['mean_cliffs_delta'])
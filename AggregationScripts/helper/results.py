@@ -0,0 +1,65 @@
+import os
+import re
+import pandas as pd
+
+
+def normalize_metric_name(name):
+    """
+    Remove the bucket size suffix (_per_XX_days) from a metric name.
+
+    Parameters:
+        name (str): The metric name, usually the file name of a metric CSV without extension.
+
+    Returns:
+        str: The metric name without the bucket size suffix.
+    """
+    return re.sub(r'_per_\d+_days$', '', name)
+
+
+def metric_name_from_path(path):
+    """
+    Derive the normalized metric name from the path of a metric CSV.
+
+    Parameters:
+        path (str): The path of a metric CSV, e.g. '.../M1_per_90_days.csv'.
+
+    Returns:
+        str: The normalized metric name, e.g. 'M1'.
+    """
+    return normalize_metric_name(os.path.basename(path).replace(".csv", ""))
+
+
+def load_metric_results(files, repositories_to_delete=None, renaming_dict=None):
+    """
+    Load all metric CSVs into one long table with one row per metric and repository.
+
+    The bucket columns are kept, a 'metric' and a 'source_file' column are added and the
+    original row index of each file is stored as 'source_row', so that results computed on
+    the consolidated table can be written back to the files they came from.
+
+    Parameters:
+        files (list): Paths of the metric CSVs (RESULTS_DIRECTORY/metric_calculation_{BUCKET_SIZE}/*.csv).
+        repositories_to_delete (list): Repositories or participants to exclude.
+        renaming_dict (dict): Optional mapping of repository names to display names (SYNONYM).
+
+    Returns:
+        pd.DataFrame: The consolidated results of all metric files.
+    """
+    frames = []
+    for file in files:
+        df = pd.read_csv(file, index_col=0)
+
+        if repositories_to_delete:
+            df = df[~df["repository"].isin(repositories_to_delete)]
+        if renaming_dict:
+            df["repository"] = df["repository"].replace(renaming_dict)
+
+        df = df.reset_index(names="source_row")
+        df.insert(0, "metric", metric_name_from_path(file))
+        df.insert(1, "source_file", file)
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["metric", "source_file", "source_row", "repository"])
+
+    return pd.concat(frames, ignore_index=True, sort=False)
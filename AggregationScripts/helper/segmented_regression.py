@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+COEFFICIENTS = ['intercept', 'pre_slope', 'level_change', 'slope_change']
+
+
+def _bucket_columns(df, prefix):
+    columns = [col for col in df.columns if col.startswith(prefix)]
+    return sorted(columns, key=lambda col: int(col[len(prefix):]) if col[len(prefix):].isdigit() else col)
+
+
+def segmented_regression(pre_values, post_values):
+    """
+    Fit an interrupted time series model to every row of two bucket matrices in one batched least-squares solve.
+
+    The model is y = intercept + pre_slope * t + level_change * post + slope_change * post * t, where t is the
+    position of a bucket relative to the introduction date in buckets (the last pre bucket of a row is at t = -1,
+    the first post bucket at t = 0) and post marks the post buckets. NaN buckets are masked out of the fit, the
+    other buckets keep their positions (as the slopes of merge_results.ipynb). The pre and post slopes equal
+    separate linear fits of both sides; level_change is the jump at the introduction date.
+
+    Parameters:
+        pre_values (np.ndarray): The pre buckets, shape (rows, pre buckets), NaN-padded.
+        post_values (np.ndarray): The post buckets, shape (rows, post buckets), NaN-padded.
+
+    Returns:
+        dict: Arrays of length rows with the coefficients (see COEFFICIENTS), their standard errors ('{name}_se'),
+        t statistics ('{name}_t') and two-sided p-values ('{name}_p'), 'post_slope', the residual degrees of
+        freedom ('df_resid') and the number of pre and post buckets ('n_pre', 'n_post'). Rows with fewer than two
+        buckets on a side are NaN; standard errors need at least five buckets in total.
+    """
+    from scipy.stats import t as t_distribution
+
+    pre_values = np.asarray(pre_values, dtype=float)
+    post_values = np.asarray(post_values, dtype=float)
+    n_rows = len(pre_values)
+
+    pre_valid = ~np.isnan(pre_values)
+    post_valid = ~np.isnan(post_values)
+    # The pre side ends with the last non-NaN bucket of a row, which is directly before the introduction date
+    pre_length = np.where(pre_valid.any(axis=1), pre_values.shape[1] - np.argmax(pre_valid[:, ::-1], axis=1), 0)
+    pre_time = np.arange(pre_values.shape[1])[None, :] - pre_length[:, None]
+    post_time = np.broadcast_to(np.arange(post_values.shape[1])[None, :], post_values.shape)
+
+    # Stacked design matrices (rows, buckets, 4) with the masked buckets set to zero
+    time = np.hstack([pre_time, post_time]).astype(float)
+    post = np.hstack([np.zeros(pre_values.shape), np.ones(post_values.shape)])
+    weight = np.hstack([pre_valid, post_valid]).astype(float)
+    y = np.nan_to_num(np.hstack([pre_values, post_values]))
+    design = np.stack([np.ones(time.shape), time, post, post * time], axis=2) * weight[:, :, None]
+
+    n_pre = pre_valid.sum(axis=1)
+    n_post = post_valid.sum(axis=1)
+    fitted = (n_pre >= 2) & (n_post >= 2)
+    df_resid = np.where(fitted, n_pre + n_post - len(COEFFICIENTS), 0)
+
+    beta = np.full((n_rows, len(COEFFICIENTS)), np.nan)
+    se = np.full((n_rows, len(COEFFICIENTS)), np.nan)
+    if fitted.any():
+        X, Y = design[fitted], y[fitted] * weight[fitted]
+        xtx_inv = np.linalg.inv(np.einsum('rti,rtj->rij', X, X))
+        beta[fitted] = np.einsum('rij,rj->ri', xtx_inv, np.einsum('rti,rt->ri', X, Y))
+        residuals = Y - np.einsum('rti,ri->rt', X, beta[fitted])
+        dof = df_resid[fitted].astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sigma2 = np.where(dof > 0, (residuals ** 2).sum(axis=1) / dof, np.nan)
+        se[fitted] = np.sqrt(sigma2[:, None] * np.diagonal(xtx_inv, axis1=1, axis2=2))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_values = beta / se
+    p_values = 2 * t_distribution.sf(np.abs(t_values), np.where(df_resid > 0, df_resid, np.nan)[:, None])
+
+    result = {}
+    for i, name in enumerate(COEFFICIENTS):
+        result[name] = beta[:, i]
+        result[f'{name}_se'] = se[:, i]
+        result[f'{name}_t'] = t_values[:, i]
+        result[f'{name}_p'] = p_values[:, i]
+    result['post_slope'] = beta[:, 1] + beta[:, 3]
+    result['df_resid'] = np.where(fitted, df_resid, np.nan)
+    result['n_pre'] = n_pre
+    result['n_post'] = n_post
+    return result
+
+
+def fit_segmented_regression(results_df, pre_columns=None, post_columns=None, key_columns=None, alpha=0.05):
+    """
+    Segmented regression (level and slope change at the introduction date) for every row of a bucket table,
+    e.g. a metric CSV or the consolidated table of all metrics and repositories (helper.results.load_metric_results).
+
+    Parameters:
+        results_df (pd.DataFrame): The bucket table.
+        pre_columns (list): The pre bucket columns (default: all 'pre-' columns in bucket order).
+        post_columns (list): The post bucket columns (default: all 'post-' or, if there are none, 'aft-' columns).
+        key_columns (list): The columns identifying a row (default: 'metric' and 'repository' if present).
+        alpha (float): The significance level of the level_change_significant and slope_change_significant flags.
+
+    Returns:
+        pd.DataFrame: The key columns with the estimates of segmented_regression and the significance flags.
+    """
+    pre_columns = pre_columns or _bucket_columns(results_df, 'pre-')
+    post_columns = post_columns or _bucket_columns(results_df, 'post-') or _bucket_columns(results_df, 'aft-')
+    if key_columns is None:
+        key_columns = [col for col in ('metric', 'repository') if col in results_df.columns]
+
+    estimates = segmented_regression(results_df[pre_columns].to_numpy(dtype=float), results_df[post_columns].to_numpy(dtype=float))
+    result = pd.concat([results_df[key_columns].reset_index(drop=True), pd.DataFrame(estimates)], axis=1)
+    result['level_change_significant'] = result['level_change_p'] < alpha
+    result['slope_change_significant'] = result['slope_change_p'] < alpha
+    return result
@@ -0,0 +1,167 @@
+"""
+Difference-in-differences of the participant repositories against the non-participant (control) repositories.
+
+generate_metric_buckets runs the bucketing of the metric notebooks (truncate_to_same_length -> aggregate_by_date ->
+split_by_date -> generate_value_in_buckets) for several metrics of one CSV per repository, reading and truncating
+every file once. difference_in_differences reduces every repository to its change (mean post bucket minus mean
+pre bucket) and compares the mean changes of both groups for all metrics at once; the confidence intervals come
+from a stratified bootstrap over repositories, drawn as index matrices so all resamples and metrics are averaged
+in batched array operations.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from helper.general import aggregate_by_date, generate_value_in_buckets, split_by_date, truncate_to_same_length
+
+PARTICIPANT = 'participant'
+CONTROL = 'control'
+
+
+def repository_group(repository):
+    """
+    Returns 'control' for repositories in a non-participants directory and 'participant' otherwise.
+    """
+    return CONTROL if 'non-participants' in str(repository) else PARTICIPANT
+
+
+def generate_metric_buckets(repositories, file_name, metrics, introduction_date, bucket_size, date_column='date', start_date=None, end_date=None):
+    """
+    Bucket several metrics of one CSV (e.g. commits.csv) for all participant and control repositories.
+
+    Parameters:
+        repositories (list): The repository paths (participants and non-participants).
+        file_name (str): The CSV in every repository directory, e.g. 'commits.csv'.
+        metrics (dict): Metric name -> (aggregation_column, aggregation_function, bucket_column, bucket_aggregation),
+            e.g. {'commits': ('sha', 'count', 'count', 'sum'), 'loc_added': ('loc_added', 'sum', 'loc_added', 'sum')}.
+        introduction_date (datetime or str): The introduction date (shared by both groups).
+        bucket_size (int): The size of each bucket in days.
+        date_column (str): The date column of the CSV.
+        start_date (datetime or str): The start of the analysis period (default: START_DATE, see truncate_to_same_length).
+        end_date (datetime or str): The end of the analysis period (default: END_DATE).
+
+    Returns:
+        dict: Metric name -> DataFrame with the columns repository, group, pre-0... and post-0...
+    """
+    rows = {metric: [] for metric in metrics}
+    for repository in repositories:
+        path = os.path.join(repository, file_name)
+        if not os.path.exists(path) or os.stat(path).st_size <= 1:
+            print(f"File not found or empty: {path}. Skipping repository.")
+            continue
+        df = pd.read_csv(path)
+        if df.empty:
+            continue
+        df = truncate_to_same_length(df, introduction_date, date_column, 'defined', start_date, end_date)
+
+        repo_name = os.path.basename(str(repository).rstrip('/'))
+        for metric, (aggregation_column, aggregation_function, bucket_column, bucket_aggregation) in metrics.items():
+            daily = aggregate_by_date(df.copy(), date_column, aggregation_column, aggregation_function)
+            pre, post = split_by_date(daily, introduction_date, date_column)
+            buckets = pd.concat([
+                generate_value_in_buckets(pre, date_column, bucket_column, bucket_aggregation, bucket_size, 'pre-'),
+                generate_value_in_buckets(post, date_column, bucket_column, bucket_aggregation, bucket_size, 'post-'),
+            ], ignore_index=True)
+            result_row = {'repository': repo_name, 'group': repository_group(repository)}
+            result_row.update(buckets.set_index('bucket')[bucket_column].to_dict())
+            rows[metric].append(result_row)
+
+    return {metric: _order_bucket_columns(pd.DataFrame(metric_rows, columns=None if metric_rows else ['repository', 'group']))
+            for metric, metric_rows in rows.items()}
+
+
+def _order_bucket_columns(df):
+    # repository, group, pre-0, pre-1, ..., post-0, ...
+    pre_columns = sorted([col for col in df.columns if col.startswith('pre-')], key=lambda col: int(col[4:]))
+    post_columns = sorted([col for col in df.columns if col.startswith('post-')], key=lambda col: int(col[5:]))
+    return df[['repository', 'group'] + pre_columns + post_columns]
+
+
+def repository_changes(buckets, pre_columns=None, post_columns=None):
+    """
+    Returns the mean pre bucket, the mean post bucket and their difference ('change') per repository (NaN buckets ignored).
+    """
+    pre_columns = pre_columns or [col for col in buckets.columns if col.startswith('pre-')]
+    post_columns = post_columns or [col for col in buckets.columns if col.startswith('post-')]
+    pre_mean = _nanmean(buckets[pre_columns].to_numpy(dtype=float), axis=1)
+    post_mean = _nanmean(buckets[post_columns].to_numpy(dtype=float), axis=1)
+    result = buckets[['repository', 'group']].reset_index(drop=True)
+    result['pre_mean'] = pre_mean
+    result['post_mean'] = post_mean
+    result['change'] = post_mean - pre_mean
+    return result
+
+
+def _nanmean(values, axis):
+    # np.nanmean without the 'Mean of empty slice' warning
+    counts = (~np.isnan(values)).sum(axis=axis)
+    totals = np.nansum(values, axis=axis)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+
+def difference_in_differences(metric_buckets, n_boot=2000, alpha=0.05, seed=None, chunk_size=500):
+    """
+    Difference-in-differences effect per metric: the mean change (post - pre) of the participants minus the mean
+    change of the controls, with a stratified bootstrap over repositories.
+
+    All metrics are estimated together. The repositories are resampled within their group with the same index
+    matrix for every metric, and the group means of chunk_size resamples are computed at once, so the cost grows
+    linearly with the number of control repositories and resamples.
+
+    Parameters:
+        metric_buckets (dict): Metric name -> bucket table with a 'group' column (see generate_metric_buckets).
+        n_boot (int): The number of bootstrap resamples.
+        alpha (float): The significance level; the confidence interval is the (alpha/2, 1 - alpha/2) percentile interval.
+        seed (int): The seed of the resampling (optional).
+        chunk_size (int): The number of resamples averaged per batch (bounds the memory).
+
+    Returns:
+        pd.DataFrame: One row per metric with n_participants, n_controls, participant_change, control_change,
+        did, se (the bootstrap standard deviation), ci_lower, ci_upper, p_value (the two-sided bootstrap p-value
+        for did = 0) and significant.
+    """
+    changes = [repository_changes(buckets).set_index(['repository', 'group'])['change'].rename(metric) for metric, buckets in metric_buckets.items()]
+    # Repositories x metrics; a repository without a metric is NaN and ignored in that metric's means
+    changes = pd.concat(changes, axis=1).reset_index() if changes else pd.DataFrame(columns=['repository', 'group'])
+    metrics = list(metric_buckets)
+    participant_changes = changes.loc[changes['group'] == PARTICIPANT, metrics].to_numpy(dtype=float)
+    control_changes = changes.loc[changes['group'] == CONTROL, metrics].to_numpy(dtype=float)
+
+    participant_mean = _nanmean(participant_changes, axis=0)
+    control_mean = _nanmean(control_changes, axis=0)
+    did = participant_mean - control_mean
+
+    rng = np.random.default_rng(seed)
+    boot = np.full((n_boot, len(metrics)), np.nan)
+    if len(participant_changes) and len(control_changes):
+        for start in range(0, n_boot, chunk_size):
+            size = min(chunk_size, n_boot - start)
+            participant_index = rng.integers(0, len(participant_changes), size=(size, len(participant_changes)))
+            control_index = rng.integers(0, len(control_changes), size=(size, len(control_changes)))
+            # (resamples, repositories, metrics) -> (resamples, metrics)
+            boot[start:start + size] = _nanmean(participant_changes[participant_index], axis=1) - _nanmean(control_changes[control_index], axis=1)
+
+    valid = ~np.isnan(boot)
+    n_valid = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lower = np.array([np.percentile(boot[valid[:, i], i], 100 * alpha / 2) if n_valid[i] else np.nan for i in range(len(metrics))])
+        upper = np.array([np.percentile(boot[valid[:, i], i], 100 * (1 - alpha / 2)) if n_valid[i] else np.nan for i in range(len(metrics))])
+        se = np.array([np.std(boot[valid[:, i], i], ddof=1) if n_valid[i] > 1 else np.nan for i in range(len(metrics))])
+        below = (np.where(valid, boot, np.inf) <= 0).sum(axis=0) / n_valid
+        above = (np.where(valid, boot, -np.inf) >= 0).sum(axis=0) / n_valid
+        p_value = np.minimum(1.0, 2 * np.minimum(below, above))
+
+    return pd.DataFrame({
+        'metric': metrics,
+        'n_participants': (~np.isnan(participant_changes)).sum(axis=0) if len(participant_changes) else 0,
+        'n_controls': (~np.isnan(control_changes)).sum(axis=0) if len(control_changes) else 0,
+        'participant_change': participant_mean,
+        'control_change': control_mean,
+        'did': did,
+        'se': se,
+        'ci_lower': lower,
+        'ci_upper': upper,
+        'p_value': p_value,
+        'significant': p_value < alpha,
+    })
@@ -0,0 +1,317 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Fixed schema of the columnar file-level store (see Transform_json.ipynb)
+FILE_LEVEL_STORE_SCHEMA = {
+    'date': 'int64',
+    'file_type': 'int32',
+    'loc_added': 'float64',
+    'loc_removed': 'float64',
+    'calculated_loc_added': 'float64',
+    'calculated_loc_removed': 'float64',
+    'calculated_loc_changed': 'float64',
+    'line_count': 'float64',
+    'M1_relative_churned_LOC_manually_parsed': 'float64',
+    'M1_relative_churned_LOC_auto': 'float64',
+    'M2_relative_deleted_LOC_manually_parsed': 'float64',
+    'M2_relative_deleted_LOC_auto': 'float64',
+    'M7_relative_churned_deleted_LOC_manually_parsed': 'float64',
+    'M7_relative_churned_deleted_LOC_auto': 'float64',
+}
+
+SCHEMA_FILE = 'schema.json'
+
+
+def file_level_store_path(repository):
+    """
+    Get the directory of the columnar file-level store of a repository.
+
+    Parameters:
+        repository (str): The path of the repository (or person) folder.
+
+    Returns:
+        str: The path of the store directory next to commits_file_level_changes.csv.
+    """
+    return os.path.join(repository, 'commits_file_level_changes')
+
+
+def write_file_level_store(df, store_directory):
+    """
+    Write file-level changes as one .npy file per column of the fixed schema.
+
+    Dates are stored as int64 nanoseconds since epoch (UTC, NaT for invalid dates), file_type is
+    dictionary-encoded as int32 codes (-1 for missing) and all other columns as float64.
+    Columns of the schema that are missing in the DataFrame are skipped. The schema.json
+    is written last, so an interrupted conversion is not picked up as a valid store.
+
+    Rows are sorted by (file_type, date), and the row range of every file type is stored in the
+    schema ('file_type_ranges'), so filtering by extension is a contiguous slice of each column.
+
+    Parameters:
+        df (pd.DataFrame): The file-level changes, i.e. the content of commits_file_level_changes.csv.
+        store_directory (str): The directory to write the store to.
+
+    Returns:
+        dict: The schema that was written to schema.json.
+    """
+    os.makedirs(store_directory, exist_ok=True)
+    if os.path.exists(os.path.join(store_directory, SCHEMA_FILE)):
+        os.remove(os.path.join(store_directory, SCHEMA_FILE))
+
+    schema = {'rows': len(df), 'columns': {}, 'file_types': [], 'file_type_ranges': {}}
+
+    # Encode the sort keys first; missing file types (code -1) and invalid dates (NaT) sort first
+    encoded = {}
+    if 'date' in df.columns:
+        dates = pd.to_datetime(df['date'], errors="coerce", utc=True)
+        encoded['date'] = dates.dt.tz_convert(None).to_numpy(dtype='datetime64[ns]').view('int64')
+    if 'file_type' in df.columns:
+        categorical = pd.Categorical(df['file_type'].astype('string'))
+        schema['file_types'] = [str(category) for category in categorical.categories]
+        encoded['file_type'] = categorical.codes.astype(FILE_LEVEL_STORE_SCHEMA['file_type'])
+
+    sort_keys = [encoded[column] for column in ['date', 'file_type'] if column in encoded]
+    order = np.lexsort(sort_keys) if sort_keys else np.arange(len(df))
+
+    if 'file_type' in encoded:
+        sorted_codes = encoded['file_type'][order]
+        boundaries = np.searchsorted(sorted_codes, np.arange(len(schema['file_types']) + 1))
+        schema['file_type_ranges'] = {
+            file_type: [int(boundaries[code]), int(boundaries[code + 1])]
+            for code, file_type in enumerate(schema['file_types'])
+        }
+
+    for column, dtype in FILE_LEVEL_STORE_SCHEMA.items():
+        if column not in df.columns:
+            continue
+
+        if column in encoded:
+            values = encoded[column]
+        else:
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=dtype)
+
+        np.save(os.path.join(store_directory, f'{column}.npy'), np.ascontiguousarray(values[order], dtype=dtype))
+        schema['columns'][column] = dtype
+
+    with open(os.path.join(store_directory, SCHEMA_FILE), 'w') as f:
+        json.dump(schema, f, indent=2)
+
+    return schema
+
+
+def read_file_level_schema(store_directory):
+    """
+    Read the schema of a columnar file-level store.
+
+    Parameters:
+        store_directory (str): The directory of the store.
+
+    Returns:
+        dict: The schema, or None if the directory does not contain a complete store.
+    """
+    schema_path = os.path.join(store_directory, SCHEMA_FILE)
+    if not os.path.exists(schema_path):
+        return None
+    with open(schema_path, 'r') as f:
+        return json.load(f)
+
+
+def file_type_row_ranges(store_directory, file_types=None):
+    """
+    Get the row ranges of file types in a columnar file-level store.
+
+    Parameters:
+        store_directory (str): The directory of the store.
+        file_types (list): The file types (extensions) to look up; defaults to all file types.
+
+    Returns:
+        dict: File type to (start, stop) row range; unknown file types are omitted.
+    """
+    schema = read_file_level_schema(store_directory)
+    if schema is None:
+        raise FileNotFoundError(f"No file-level store found in {store_directory}.")
+
+    ranges = schema.get('file_type_ranges', {})
+    file_types = list(ranges) if file_types is None else file_types
+    return {file_type: tuple(ranges[file_type]) for file_type in file_types if file_type in ranges}
+
+
+def load_file_level_columns(store_directory, columns=None, mmap_mode='r', file_types=None):
+    """
+    Memory-map raw columns of a columnar file-level store.
+
+    Only the requested .npy files are opened; with mmap_mode='r' their pages are read lazily
+    and shared via the OS page cache between processes (e.g. several notebooks).
+
+    Parameters:
+        store_directory (str): The directory of the store.
+        columns (list): The columns to load; defaults to all columns of the store.
+        mmap_mode (str): The mmap mode passed to np.load (None loads the columns into memory).
+        file_types (list): Optional file types (extensions) to restrict the rows to.
+
+    Returns:
+        dict: Column name to (memory-mapped) np.ndarray in the stored encoding.
+    """
+    schema = read_file_level_schema(store_directory)
+    if schema is None:
+        raise FileNotFoundError(f"No file-level store found in {store_directory}.")
+
+    columns = list(schema['columns']) if columns is None else columns
+    loaded = {
+        column: np.load(os.path.join(store_directory, f'{column}.npy'), mmap_mode=mmap_mode)
+        for column in columns if column in schema['columns']
+    }
+    if file_types is None:
+        return loaded
+
+    # Every file type is a contiguous row range; a single file type stays a memory-mapped slice
+    ranges = sorted(file_type_row_ranges(store_directory, file_types).values())
+    if len(ranges) == 1:
+        start, stop = ranges[0]
+        return {column: values[start:stop] for column, values in loaded.items()}
+    return {
+        column: np.concatenate([values[start:stop] for start, stop in ranges]) if ranges else values[:0]
+        for column, values in loaded.items()
+    }
+
+
+def load_file_level_store(store_directory, columns=None, mmap_mode='r', file_types=None):
+    """
+    Load columns of a columnar file-level store as a DataFrame.
+
+    Dates are decoded to UTC datetimes and file_type to a pandas Categorical, all other
+    columns keep their float64 values. Requested columns that are not in the store are skipped.
+
+    Parameters:
+        store_directory (str): The directory of the store.
+        columns (list): The columns to load, e.g. ['date', 'M1_relative_churned_LOC_manually_parsed'].
+        mmap_mode (str): The mmap mode passed to np.load.
+        file_types (list): Optional file types (extensions) to restrict the rows to, e.g. ['py', 'ts'].
+
+    Returns:
+        pd.DataFrame: The requested columns of the file-level changes.
+    """
+    schema = read_file_level_schema(store_directory)
+    raw_columns = load_file_level_columns(store_directory, columns, mmap_mode, file_types)
+
+    data = {}
+    for column, values in raw_columns.items():
+        if column == 'date':
+            data[column] = pd.DatetimeIndex(values.view('datetime64[ns]')).tz_localize('UTC')
+        elif column == 'file_type':
+            codes = np.asarray(values)
+            data[column] = pd.Categorical.from_codes(codes, categories=schema['file_types'])
+        else:
+            data[column] = values
+
+    return pd.DataFrame(data, copy=False)
+
+
+def convert_file_level_csv_to_store(csv_path, store_directory=None):
+    """
+    Convert an existing commits_file_level_changes.csv into the columnar store.
+
+    Parameters:
+        csv_path (str): The path of the CSV file.
+        store_directory (str): The directory to write the store to; defaults to the CSV path without extension.
+
+    Returns:
+        dict: The schema that was written.
+    """
+    if store_directory is None:
+        store_directory = os.path.splitext(csv_path)[0]
+    usecols = lambda column: column in FILE_LEVEL_STORE_SCHEMA
+    df = pd.read_csv(csv_path, usecols=usecols, dtype={'file_type': str})
+    return write_file_level_store(df, store_directory)
+
+
+def generate_value_in_buckets_by_file_type(store_directory, introduction_date, aggregation_column, aggregation_settings='mean', bucket_size=7, file_types=None, start_date=None, end_date=None, combine=False):
+    """
+    Bucket a file-level metric before and after the introduction date for every file type in one pass.
+
+    Produces the same buckets as running truncate_to_same_length (direction 'defined'), split_by_date
+    and generate_value_in_buckets on the rows of each file type separately: buckets are anchored at the
+    first date of each file type and side, buckets without rows are NaN and buckets whose rows only have
+    NaN values are 0 ('sum', 'count') or NaN ('mean'). Instead of filtering
+    the rows once per file type, the sorted (file_type, date) layout of the store is used to compute
+    the anchors per file type and all bucket sums and counts with a single np.bincount.
+
+    Parameters:
+        store_directory (str): The directory of the columnar file-level store.
+        introduction_date (datetime or str): The date to split the data on.
+        aggregation_column (str): The metric column to aggregate.
+        aggregation_settings (str): 'mean', 'sum' or 'count'.
+        bucket_size (int): The size of each bucket in days.
+        file_types (list): The file types (extensions) to include; defaults to all file types.
+        start_date (datetime or str): Optional inclusive start of the analysed time range.
+        end_date (datetime or str): Optional inclusive end of the analysed time range.
+        combine (bool): Whether to treat the selected file types as one group instead of one row each.
+
+    Returns:
+        pd.DataFrame: One row per file type (or one row 'combined') with 'pre-i' and 'post-i' bucket columns.
+    """
+    ranges = file_type_row_ranges(store_directory, file_types)
+    ranges = {file_type: row_range for file_type, row_range in ranges.items() if row_range[1] > row_range[0]}
+    columns = load_file_level_columns(store_directory, ['date', aggregation_column])
+    labels = ['combined'] if combine else list(ranges)
+    if not ranges:
+        return pd.DataFrame(index=pd.Index(labels, name='file_type'))
+
+    starts = np.array([row_range[0] for row_range in ranges.values()])
+    stops = np.array([row_range[1] for row_range in ranges.values()])
+    rows = np.concatenate([np.arange(start, stop) for start, stop in zip(starts, stops)])
+    groups = np.zeros(len(rows), dtype=np.int64) if combine else np.repeat(np.arange(len(ranges)), stops - starts)
+
+    dates = np.asarray(columns['date'][rows])
+    values = np.asarray(columns[aggregation_column][rows], dtype=float)
+
+    to_ns = lambda date: pd.to_datetime(date, utc=True).tz_convert(None).to_datetime64().astype('datetime64[ns]').view('int64')
+    in_range = dates != np.iinfo(np.int64).min
+    if start_date is not None:
+        in_range &= dates >= to_ns(start_date)
+    if end_date is not None:
+        in_range &= dates <= to_ns(end_date)
+    dates, values, groups = dates[in_range], values[in_range], groups[in_range]
+
+    # One key per (file type, side); the anchor of every key is its first date
+    after = dates >= to_ns(introduction_date)
+    keys = groups * 2 + after
+    n_keys = len(labels) * 2
+    anchors = np.full(n_keys, np.iinfo(np.int64).max)
+    np.minimum.at(anchors, keys, dates)
+    day = 24 * 60 * 60 * 10 ** 9
+    buckets = (dates - anchors[keys]) // day // bucket_size
+
+    last_dates = np.full(n_keys, np.iinfo(np.int64).min)
+    np.maximum.at(last_dates, keys, dates)
+    n_buckets = np.where(last_dates >= anchors, (last_dates - anchors) // day // bucket_size + 1, 0)
+    width = int(n_buckets.max()) if len(n_buckets) else 0
+
+    valid = ~np.isnan(values)
+    flat = keys * width + buckets
+    # As groupby().agg(), a bucket with rows but only NaN values has sum and count 0 and mean NaN
+    rows_per_bucket = np.bincount(flat, minlength=n_keys * width).reshape(n_keys, width)
+    counts = np.bincount(flat[valid], minlength=n_keys * width).reshape(n_keys, width)
+    sums = np.bincount(flat[valid], weights=values[valid], minlength=n_keys * width).reshape(n_keys, width)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if aggregation_settings == 'mean':
+            aggregated = sums / counts
+        elif aggregation_settings == 'sum':
+            aggregated = np.where(rows_per_bucket > 0, sums, np.nan)
+        elif aggregation_settings == 'count':
+            aggregated = np.where(rows_per_bucket > 0, counts, np.nan)
+        else:
+            raise ValueError(f"Unsupported aggregation: {aggregation_settings}. Use 'mean', 'sum' or 'count'.")
+
+    result = {}
+    for side, prefix in enumerate(['pre-', 'post-']):
+        side_buckets = n_buckets[side::2]
+        for i in range(int(side_buckets.max())):
+            column = aggregated[side::2, i].copy()
+            column[i >= side_buckets] = np.nan
+            result[f'{prefix}{i}'] = column
+
+    return pd.DataFrame(result, index=pd.Index(labels, name='file_type'))
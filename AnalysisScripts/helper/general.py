@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import os
 
@@ -94,8 +95,105 @@ def generate_value_in_buckets(df, date_column, aggregation_column, aggregation_s
     aggregated_df = pd.merge(all_buckets, aggregated_df, on="bucket", how="left")
 
     return aggregated_df
-    
-def split_by_date(df, introduction_date, date_column):
+
+def generate_rolling_values(df, date_column, aggregation_columns, window_days=30, aggregations=('sum', 'count', 'mean'),
+                            start_date=None, end_date=None, introduction_date=None, complete_windows=False):
+    """
+    Generate sliding-window values (one window per day) of several columns in a single pass.
+
+    The rows are reduced to daily sums and counts on a gap-free daily grid and every window is the difference of
+    two cumulative sums, so the cost is linear in rows plus days instead of one bucketing pass per window.
+    The window ending on a day covers that day and the window_days - 1 days before it, as pandas'
+    rolling(f'{window_days}D') on the daily series.
+
+    Parameters:
+        df (pd.DataFrame): The input DataFrame (e.g. commits.csv or the output of aggregate_by_date).
+        date_column (str): The name of the date column in the DataFrame.
+        aggregation_columns (list): The columns to aggregate.
+        window_days (int): The size of each window in days.
+        aggregations (list): Any of 'sum', 'count' (non-missing values) and 'mean'.
+        start_date (datetime or str): The first day of the grid (default: the first date in df).
+        end_date (datetime or str): The last day of the grid (default: the last date in df).
+        introduction_date (datetime or str): Adds a 'days_from_introduction' column relative to this date (optional).
+        complete_windows (bool): Whether to drop the first window_days - 1 days, whose windows reach before the grid.
+
+    Returns:
+        pd.DataFrame: One row per day with the columns date (the last day of the window), (days_from_introduction,)
+        rows (the rows in the window) and '{column}_{aggregation}' for every column and aggregation.
+    """
+    if isinstance(aggregation_columns, str):
+        aggregation_columns = [aggregation_columns]
+    unknown = [aggregation for aggregation in aggregations if aggregation not in ('sum', 'count', 'mean')]
+    if unknown:
+        raise ValueError(f"Unknown aggregations {unknown}, expected 'sum', 'count' or 'mean'.")
+
+    dates = pd.to_datetime(df[date_column], errors="coerce", utc=True)
+    # Rows outside [start_date, end_date] are dropped as in truncate_to_same_length(..., 'defined')
+    if start_date is not None:
+        start_date = pd.to_datetime(start_date, utc=True)
+        dates = dates.where(dates >= start_date)
+    if end_date is not None:
+        end_date = pd.to_datetime(end_date, utc=True)
+        dates = dates.where(dates <= end_date)
+    days = dates.dt.floor('D')
+    first_day = start_date.floor('D') if start_date is not None else days.min()
+    last_day = end_date.floor('D') if end_date is not None else days.max()
+    if pd.isna(first_day) or pd.isna(last_day) or first_day > last_day:
+        columns = ['date'] + (['days_from_introduction'] if introduction_date is not None else []) + ['rows']
+        return pd.DataFrame(columns=columns + [f'{column}_{aggregation}' for column in aggregation_columns for aggregation in aggregations])
+
+    # Day offsets on the grid; rows with invalid dates have none
+    n_days = (last_day - first_day).days + 1
+    offsets = ((days - first_day).dt.days).to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(offsets)
+    offsets = offsets[valid].astype(np.int64)
+
+    def window_totals(weights=None):
+        # Sum over the trailing window of every day: cumulative[i + 1] - cumulative[i + 1 - window_days]
+        cumulative = np.concatenate([[0.0], np.cumsum(np.bincount(offsets, weights=weights, minlength=n_days))])
+        ends = np.arange(1, n_days + 1)
+        return cumulative[ends] - cumulative[np.maximum(ends - window_days, 0)]
+
+    result = pd.DataFrame({'date': pd.date_range(first_day, periods=n_days, freq='D')})
+    if introduction_date is not None:
+        introduction_day = pd.to_datetime(introduction_date, utc=True).floor('D')
+        result['days_from_introduction'] = (result['date'] - introduction_day).dt.days
+    result['rows'] = window_totals().astype(np.int64)
+
+    for column in aggregation_columns:
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)[valid]
+        has_value = ~np.isnan(values)
+        sums = window_totals(np.where(has_value, values, 0.0))
+        counts = window_totals(has_value.astype(float))
+        for aggregation in aggregations:
+            if aggregation == 'sum':
+                result[f'{column}_sum'] = sums
+            elif aggregation == 'count':
+                result[f'{column}_count'] = counts.astype(np.int64)
+            else:
+                result[f'{column}_mean'] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    if complete_windows:
+        result = result.iloc[window_days - 1:].reset_index(drop=True)
+    return result
+
+def sort_by_date(df, date_col):
+    """
+    Prepare a DataFrame for the sorted-date index mode of split_by_date and truncate_to_same_length (presorted=True).
+
+    Parameters:
+        df (pd.DataFrame): The input DataFrame.
+        date_col (str): The column containing date values.
+
+    Returns:
+        pd.DataFrame: A copy with the dates converted to UTC datetimes, invalid dates dropped and the rows stably sorted by date.
+    """
+    df = df.copy()
+    df[date_col] = pd.to_datetime(df[date_col], errors="coerce", utc=True)
+    df = df.dropna(subset=[date_col])
+    return df.sort_values(date_col, kind='stable')
+
+def split_by_date(df, introduction_date, date_column, presorted=False):
     """
     Split the DataFrame into two parts: one with data before the introduction date and one after.
 
@@ -103,10 +201,19 @@ def split_by_date(df, introduction_date, date_column):
         df (pd.DataFrame): The input DataFrame.
         introduction_date (datetime or str): The date to split the DataFrame on.
         date_column (str): The name of the date column in the DataFrame.
+        presorted (bool): Whether df was prepared with sort_by_date. The split point is then found by binary search
+            and both parts are iloc slices of df instead of boolean-mask copies.
 
     Returns:
         tuple: Two DataFrames, one with data before the introduction date and one with data after.
     """
+    if presorted:
+        introduction_date = pd.to_datetime(introduction_date, errors="coerce", utc=True)
+        if pd.isna(introduction_date):
+            return df.iloc[:0], df.iloc[:0]
+        split = df[date_column].searchsorted(introduction_date, side='left')
+        return df.iloc[:split], df.iloc[split:]
+
     # Ensure the date column is in datetime format
     df[date_column] = pd.to_datetime(df[date_column], errors="coerce", utc=True)
     df = df.dropna(subset=[date_column])  # Drop rows with invalid dates
@@ -121,7 +228,7 @@ def split_by_date(df, introduction_date, date_column):
     return before_intro, after_intro
     
     
-def truncate_to_same_length(df, introduction_date, date_col, direction='both', start_date=None, end_date=None):
+def truncate_to_same_length(df, introduction_date, date_col, direction='both', start_date=None, end_date=None, presorted=False):
     """
     Truncate the DataFrame to ensure equal time ranges before and/or after the introduction date.
 
@@ -130,13 +237,20 @@ def truncate_to_same_length(df, introduction_date, date_col, direction='both', s
         introduction_date (datetime or str): The date to truncate around.
         date_col (str): The name of the date column in the DataFrame.
         direction (str): The direction to truncate ('both', 'before', 'after', 'defined').
+        start_date (datetime or str): The start for 'defined' (default: START_DATE); the end of 'before' is end_date
+            if given, otherwise open.
+        end_date (datetime or str): The end for 'defined' (default: END_DATE); the start of 'after' is start_date
+            if given, otherwise open.
+        presorted (bool): Whether df was prepared with sort_by_date. The window bounds are then found by binary search
+            and the result is an iloc slice of df instead of a boolean-mask copy.
 
     Returns:
         pd.DataFrame: The truncated DataFrame.
     """
-    # Ensure the date column is in datetime format 
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce", utc=True)
-    df = df.dropna(subset=[date_col])  # Drop rows with invalid dates
+    if not presorted:
+        # Ensure the date column is in datetime format 
+        df[date_col] = pd.to_datetime(df[date_col], errors="coerce", utc=True)
+        df = df.dropna(subset=[date_col])  # Drop rows with invalid dates
 
     # Convert introduction_date to datetime if it's a string
     introduction_date = pd.to_datetime(introduction_date, errors="coerce", utc=True)
@@ -144,8 +258,12 @@ def truncate_to_same_length(df, introduction_date, date_col, direction='both', s
         raise ValueError("Invalid introduction_date provided.")
 
     # Calculate the time range for truncation
-    min_date = df[date_col].min()
-    max_date = df[date_col].max()
+    if presorted:
+        min_date = df[date_col].iloc[0] if len(df) else pd.NaT
+        max_date = df[date_col].iloc[-1] if len(df) else pd.NaT
+    else:
+        min_date = df[date_col].min()
+        max_date = df[date_col].max()
     time_before = (introduction_date - min_date).days
     time_after = (max_date - introduction_date).days
 
@@ -163,7 +281,8 @@ def truncate_to_same_length(df, introduction_date, date_col, direction='both', s
         if start_date > end_date:
             raise ValueError("START_DATE cannot be after END_DATE.")
 
-        df = df[(df[date_col] >= start_date) & (df[date_col] <= end_date)]
+        if not presorted:
+            df = df[(df[date_col] >= start_date) & (df[date_col] <= end_date)]
     
     elif direction == 'both':
         truncate_days = min(time_before, time_after)
@@ -178,7 +297,18 @@ def truncate_to_same_length(df, introduction_date, date_col, direction='both', s
     # # Truncate the data
     # truncated_start_date = introduction_date - pd.Timedelta(days=truncate_days)
     # truncated_end_date = introduction_date + pd.Timedelta(days=truncate_days)
-    df = df[(df[date_col] >= start_date) & (df[date_col] <= end_date)]
+    # 'before' only bounds the start and 'after' only the end (unless given); a missing bound leaves that side open
+    if presorted:
+        dates = df[date_col]
+        first = dates.searchsorted(start_date, side='left') if start_date is not None else 0
+        last = dates.searchsorted(end_date, side='right') if end_date is not None else len(df)
+        return df.iloc[first:last]
+    keep = np.ones(len(df), dtype=bool)
+    if start_date is not None:
+        keep &= (df[date_col] >= start_date).to_numpy()
+    if end_date is not None:
+        keep &= (df[date_col] <= end_date).to_numpy()
+    df = df[keep]
         
     return df
 
@@ -198,4 +328,9 @@ def validate_path(path):
     if not os.path.exists(path) or os.stat(path).st_size == 1:
         print(f"File not found or empty: {path}. Skipping repository.")
         return False
-    return True
\ No newline at end of file
+    return True
+
+
+# Record the calls of the public functions if ANALYSIS_PROFILE is set (see helper.instrumentation)
+from helper.instrumentation import instrument_functions  # noqa: E402
+instrument_functions(globals(), __name__)
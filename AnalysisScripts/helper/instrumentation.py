@@ -0,0 +1,256 @@
+"""
+Opt-in stage-level timing and memory instrumentation for the analysis notebooks.
+
+Set ``ANALYSIS_PROFILE=1`` (e.g. in the .env file) to record every call of the public functions of
+helper.general and helper.significance and every iteration of the repository loop
+(``for repository in track_repositories(repositories)``). Each record holds the wall time, the CPU time,
+the wall time not spent in nested stages (for a repository: CSV parsing and the notebook code), the rows
+in and out and the peak RSS of the process. ``write_profile`` writes the records as JSON and CSV to
+``RESULTS_DIRECTORY/profiles``. Without the variable, the wrappers only call through.
+"""
+import contextlib
+import csv
+import functools
+import inspect
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+PROFILE_VARIABLE = 'ANALYSIS_PROFILE'
+RECORD_FIELDS = ['stage', 'repository', 'depth', 'start_seconds', 'wall_seconds', 'self_seconds', 'cpu_seconds', 'rows_in', 'rows_out', 'peak_rss_mib']
+
+_records = []
+# The current repository and the accumulated wall time of the nested stages of every open stage
+_state = {'repository': None, 'children': [0.0], 'start': None}
+
+
+def is_enabled():
+    """
+    Returns True if the instrumentation is enabled via the ANALYSIS_PROFILE environment variable.
+    """
+    return os.getenv(PROFILE_VARIABLE, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def peak_rss_mib():
+    """
+    Returns the peak resident set size of the process in MiB (None if it cannot be determined).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is given in bytes on macOS and in KiB on Linux
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def count_rows(value):
+    """
+    Returns the number of rows of a DataFrame, Series or array, the summed rows of a tuple or list of them,
+    or None for other values.
+    """
+    if isinstance(value, (tuple, list)):
+        counts = [count_rows(item) for item in value]
+        counts = [count for count in counts if count is not None]
+        return sum(counts) if counts else None
+    if hasattr(value, 'shape') and len(getattr(value, 'shape', ())) > 0:
+        return int(value.shape[0])
+    return None
+
+
+@contextlib.contextmanager
+def stage(name, repository=None, rows_in=None):
+    """
+    Record the enclosed code as one stage. Set 'rows_out' in the yielded dictionary to record the output rows.
+
+    Parameters:
+        name (str): The name of the stage (e.g. 'plotting').
+        repository (str): The repository the stage belongs to (by default the repository of the enclosing stage).
+        rows_in (int): The number of input rows (optional).
+
+    Yields:
+        dict: A dictionary for the 'rows_out' of the stage.
+    """
+    info = {'rows_out': None}
+    if not is_enabled():
+        yield info
+        return
+
+    if _state['start'] is None:
+        _state['start'] = time.perf_counter()
+    previous_repository = _state['repository']
+    if repository is not None:
+        _state['repository'] = repository
+    _state['children'].append(0.0)
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield info
+    finally:
+        wall = time.perf_counter() - start_wall
+        cpu = time.process_time() - start_cpu
+        children = _state['children'].pop()
+        _state['children'][-1] += wall
+        _records.append({
+            'stage': name,
+            'repository': _state['repository'],
+            'depth': len(_state['children']) - 1,
+            'start_seconds': start_wall - _state['start'],
+            'wall_seconds': wall,
+            'self_seconds': wall - children,
+            'cpu_seconds': cpu,
+            'rows_in': rows_in,
+            'rows_out': info['rows_out'],
+            'peak_rss_mib': peak_rss_mib(),
+        })
+        _state['repository'] = previous_repository
+
+
+def instrumented(function, name=None):
+    """
+    Wrap a function so that every call is recorded as a stage while the instrumentation is enabled.
+
+    Parameters:
+        function (callable): The function.
+        name (str): The stage name (defaults to the module and function name, e.g. 'general.split_by_date').
+
+    Returns:
+        callable: The wrapper.
+    """
+    name = name or f"{function.__module__.split('.')[-1]}.{function.__name__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not is_enabled():
+            return function(*args, **kwargs)
+        # The largest input frame is the one the function works on (e.g. not the normality results)
+        rows = [count_rows(argument) for argument in list(args) + list(kwargs.values())]
+        rows = [count for count in rows if count is not None]
+        with stage(name, rows_in=max(rows) if rows else None) as info:
+            result = function(*args, **kwargs)
+            info['rows_out'] = count_rows(result)
+        return result
+
+    wrapper.__wrapped__ = function
+    return wrapper
+
+
+def instrument_functions(namespace, module_name):
+    """
+    Replace the public functions defined in a module by instrumented wrappers; called at the end of the helper
+    modules with their globals().
+
+    Parameters:
+        namespace (dict): The globals of the module.
+        module_name (str): The name of the module.
+    """
+    for name, value in list(namespace.items()):
+        if inspect.isfunction(value) and value.__module__ == module_name and not name.startswith('_'):
+            namespace[name] = instrumented(value)
+
+
+def track_repositories(repositories):
+    """
+    Iterate over the repositories and record every iteration of the loop body as a 'repository' stage.
+
+    Parameters:
+        repositories (list): The repository paths.
+
+    Yields:
+        str: The repository paths.
+    """
+    for repository in repositories:
+        if not is_enabled():
+            yield repository
+            continue
+        with stage('repository', repository=os.path.basename(str(repository).rstrip('/'))):
+            yield repository
+
+
+def get_profile_records():
+    """
+    Returns a copy of the records collected so far.
+    """
+    return [dict(record) for record in _records]
+
+
+def reset_profile():
+    """
+    Discard the collected records.
+    """
+    _records.clear()
+    _state['start'] = None
+
+
+def summarize_profile(records):
+    """
+    Sum the records per stage.
+
+    Parameters:
+        records (list): The records (see get_profile_records).
+
+    Returns:
+        list: One dictionary per stage with the number of calls, the summed wall, self and CPU time and the
+        maximum peak RSS, sorted by the self time.
+    """
+    summary = {}
+    for record in records:
+        entry = summary.setdefault(record['stage'], {'stage': record['stage'], 'calls': 0, 'wall_seconds': 0.0, 'self_seconds': 0.0,
+                                                     'cpu_seconds': 0.0, 'peak_rss_mib': None})
+        entry['calls'] += 1
+        for field in ('wall_seconds', 'self_seconds', 'cpu_seconds'):
+            entry[field] += record[field]
+        if record['peak_rss_mib'] is not None:
+            entry['peak_rss_mib'] = max(entry['peak_rss_mib'] or 0, record['peak_rss_mib'])
+    return sorted(summary.values(), key=lambda entry: entry['self_seconds'], reverse=True)
+
+
+def write_profile(results_directory, name, reset=True):
+    """
+    Write the collected records to RESULTS_DIRECTORY/profiles/{name}_{timestamp}.json and .csv and print the
+    stages with the most self time. Does nothing if the instrumentation is disabled.
+
+    Parameters:
+        results_directory (str): The RESULTS_DIRECTORY of the run.
+        name (str): The name of the run, e.g. the notebook name.
+        reset (bool): Whether to discard the records afterwards.
+
+    Returns:
+        str: The path of the JSON profile, or None if nothing was written.
+    """
+    if not is_enabled() or not _records:
+        return None
+
+    directory = os.path.join(results_directory, 'profiles')
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    base_path = os.path.join(directory, f'{name}_{timestamp}')
+    summary = summarize_profile(_records)
+
+    with open(f'{base_path}.json', 'w') as f:
+        json.dump({
+            'name': name,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {variable: os.getenv(variable) for variable in ('BUCKET_SIZE', 'INTRO_DATE', 'START_DATE', 'END_DATE', 'PER_PERSON')},
+            'summary': summary,
+            'records': _records,
+        }, f, indent=2)
+    with open(f'{base_path}.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS)
+        writer.writeheader()
+        writer.writerows(_records)
+
+    print(f"Profile written to {base_path}.json")
+    for entry in summary[:10]:
+        print(f"{entry['stage']:<60} {entry['calls']:>6} calls {entry['self_seconds']:>9.3f}s self {entry['wall_seconds']:>9.3f}s wall")
+
+    if reset:
+        reset_profile()
+    return f'{base_path}.json'
@@ -0,0 +1,213 @@
+"""
+Placebo tests: the pre/post bucket comparison repeated with fake introduction dates shifted across the history.
+
+Instead of running truncate_to_same_length -> split_by_date -> generate_value_in_buckets once per fake date,
+the events of a repository are reduced once to daily prefix sums (DailyPrefixSums). The pre and post buckets of
+any introduction date are then differences of prefix sums, so a sweep over hundreds of dates costs
+O(dates x buckets) instead of hundreds of passes over the raw frame, and all (repository, date) rows are tested
+in one batched call.
+
+The buckets follow generate_value_in_buckets: each side is anchored at its first active day, every bucket covers
+bucket_size days and buckets without events are NaN. Bucket boundaries are at midnight, so the buckets equal those
+of the notebooks for day-aggregated frames (aggregate_by_date); for raw timestamps, generate_value_in_buckets
+anchors at the time of day of the first event instead.
+"""
+import numpy as np
+import pandas as pd
+
+from helper.significance import _cliffs_delta_rows, _mann_whitney_rows
+
+AGGREGATIONS = ['sum', 'count', 'mean']
+
+
+class DailyPrefixSums:
+    """
+    Cumulative row counts, value sums and value counts of a frame on a daily grid.
+
+    All prefix arrays have one more entry than days, so the total over the days [a, b) is prefix[b] - prefix[a].
+    """
+
+    def __init__(self, df, date_col, value_column=None, start_date=None, end_date=None):
+        """
+        Parameters:
+            df (pd.DataFrame): The events (e.g. commits.csv or the output of aggregate_by_date).
+            date_col (str): The column containing date values.
+            value_column (str): The column to aggregate; None counts every row as 1.
+            start_date (datetime or str): Only rows at or after this date are used (optional, as truncate_to_same_length).
+            end_date (datetime or str): Only rows at or before this date are used (optional).
+        """
+        dates = pd.to_datetime(df[date_col], errors="coerce", utc=True)
+        valid = dates.notna().to_numpy().copy()
+        if start_date is not None:
+            valid &= (dates >= pd.to_datetime(start_date, utc=True)).to_numpy()
+        if end_date is not None:
+            valid &= (dates <= pd.to_datetime(end_date, utc=True)).to_numpy()
+        dates = dates[valid]
+        values = np.ones(valid.sum()) if value_column is None else pd.to_numeric(df[value_column], errors='coerce').to_numpy(dtype=float)[valid]
+
+        days = dates.dt.floor('D')
+        self.first_day = days.min() if len(days) else pd.NaT
+        offsets = (days - self.first_day).dt.days.to_numpy(dtype=np.int64) if len(days) else np.zeros(0, dtype=np.int64)
+        n_days = int(offsets.max()) + 1 if len(offsets) else 0
+
+        has_value = ~np.isnan(values)
+        self.rows = np.concatenate([[0], np.cumsum(np.bincount(offsets, minlength=n_days))])
+        self.sums = np.concatenate([[0.0], np.cumsum(np.bincount(offsets[has_value], weights=values[has_value], minlength=n_days))])
+        self.counts = np.concatenate([[0], np.cumsum(np.bincount(offsets[has_value], minlength=n_days))])
+        self.active_days = np.flatnonzero(np.diff(self.rows))
+
+    def day_offset(self, dates):
+        """
+        Returns the day offsets of dates relative to the first day (the day an introduction date falls on).
+        """
+        dates = pd.to_datetime(pd.Index(dates), utc=True)
+        return ((dates - self.first_day) / pd.Timedelta(days=1)).to_numpy()
+
+    def aggregate(self, start, stop, aggregation='sum'):
+        """
+        Aggregate the days [start, stop) (arrays of day offsets within the grid).
+
+        Parameters:
+            start (np.ndarray): The first day of every range.
+            stop (np.ndarray): The day after the last day of every range.
+            aggregation (str): 'sum', 'count' (non-missing values) or 'mean'.
+
+        Returns:
+            np.ndarray: The aggregated values; NaN for ranges without rows.
+        """
+        rows = self.rows[stop] - self.rows[start]
+        if aggregation == 'sum':
+            result = self.sums[stop] - self.sums[start]
+        elif aggregation == 'count':
+            result = (self.counts[stop] - self.counts[start]).astype(float)
+        elif aggregation == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = (self.sums[stop] - self.sums[start]) / (self.counts[stop] - self.counts[start])
+        else:
+            raise ValueError(f"Unknown aggregation '{aggregation}', expected one of {AGGREGATIONS}.")
+        return np.where(rows > 0, result, np.nan)
+
+
+def _side_buckets(prefix, first, last, limit, bucket_size, aggregation):
+    # Buckets anchored at the first active day of every side; NaN where a side has fewer buckets or no data
+    has_data = last >= first
+    n_buckets = np.where(has_data, (last - first) // bucket_size + 1, 0)
+    width = int(n_buckets.max()) if len(n_buckets) else 0
+    k = np.arange(width)
+    start = first[:, None] + k * bucket_size
+    stop = np.minimum(start + bucket_size, limit[:, None])
+    inside = k < n_buckets[:, None]
+    start = np.where(inside, start, 0)
+    stop = np.where(inside, stop, 0)
+    values = prefix.aggregate(start, stop, aggregation)
+    return np.where(inside, values, np.nan)
+
+
+def placebo_buckets(prefix, intro_dates, bucket_size, aggregation='sum'):
+    """
+    Pre and post buckets of one repository for many introduction dates.
+
+    Parameters:
+        prefix (DailyPrefixSums): The daily prefix sums of the repository.
+        intro_dates (list): The (fake) introduction dates.
+        bucket_size (int): The size of each bucket in days.
+        aggregation (str): 'sum', 'count' or 'mean'.
+
+    Returns:
+        tuple: Two NaN-padded arrays of shape (len(intro_dates), buckets) with the pre and post buckets.
+    """
+    n_days = len(prefix.rows) - 1
+    # Days before the introduction date are pre; a date during a day puts that day (midnight in day-aggregated frames) into pre
+    split = np.clip(np.ceil(prefix.day_offset(intro_dates)), 0, n_days).astype(np.int64) if n_days else np.zeros(len(intro_dates), dtype=np.int64)
+    active = prefix.active_days
+    position = np.searchsorted(active, split, side='left')
+
+    empty = np.full(len(split), -1)
+    if len(active):
+        pre_first = np.where(position > 0, active[0], 0)
+        pre_last = np.where(position > 0, active[np.maximum(position - 1, 0)], -1)
+        post_first = np.where(position < len(active), active[np.minimum(position, len(active) - 1)], 0)
+        post_last = np.where(position < len(active), active[-1], -1)
+    else:
+        pre_first = post_first = np.zeros(len(split), dtype=np.int64)
+        pre_last = post_last = empty
+
+    pre = _side_buckets(prefix, pre_first, pre_last, split, bucket_size, aggregation)
+    post = _side_buckets(prefix, post_first, post_last, np.full(len(split), n_days), bucket_size, aggregation)
+    return pre, post
+
+
+def placebo_sweep(prefixes, intro_dates, bucket_size, aggregation='sum', reference_dates=None, fill_value=None):
+    """
+    Bucket table for all repositories and (fake) introduction dates.
+
+    Parameters:
+        prefixes (dict): DailyPrefixSums per repository.
+        intro_dates (list or dict): The introduction dates for all repositories, or a list per repository.
+        bucket_size (int): The size of each bucket in days.
+        aggregation (str): 'sum', 'count' or 'mean'.
+        reference_dates (dict): The real introduction date per repository (optional); adds a 'shift_days' column.
+        fill_value (float): Replaces empty buckets within the range of a side (as the notebooks' fillna(0)); None keeps NaN.
+
+    Returns:
+        pd.DataFrame: One row per repository and introduction date with the columns repository, intro_date,
+        (shift_days,) pre-0... and post-0... like the notebooks' bucket tables.
+    """
+    frames = []
+    for repository, prefix in prefixes.items():
+        dates = pd.to_datetime(pd.Index(intro_dates[repository] if isinstance(intro_dates, dict) else intro_dates), utc=True)
+        pre, post = placebo_buckets(prefix, dates, bucket_size, aggregation)
+        if fill_value is not None:
+            pre, post = _fill_inside(pre, fill_value), _fill_inside(post, fill_value)
+        frame = pd.concat([
+            pd.DataFrame({'repository': repository, 'intro_date': dates}),
+            pd.DataFrame(pre, columns=[f'pre-{i}' for i in range(pre.shape[1])]),
+            pd.DataFrame(post, columns=[f'post-{i}' for i in range(post.shape[1])]),
+        ], axis=1)
+        if reference_dates is not None:
+            frame.insert(2, 'shift_days', (dates - pd.to_datetime(reference_dates[repository], utc=True)).days)
+        frames.append(frame)
+
+    sweep = pd.concat(frames, ignore_index=True)
+    # Order the bucket columns numerically (pre-0, pre-1, ..., post-0, ...)
+    key_columns = [column for column in sweep.columns if not column.startswith(('pre-', 'post-'))]
+    pre_columns = sorted([column for column in sweep.columns if column.startswith('pre-')], key=lambda column: int(column[4:]))
+    post_columns = sorted([column for column in sweep.columns if column.startswith('post-')], key=lambda column: int(column[5:]))
+    return sweep[key_columns + pre_columns + post_columns]
+
+
+def _fill_inside(values, fill_value):
+    # Fill empty buckets, but not the padding beyond the last bucket of a side
+    filled = values.copy()
+    counts = (~np.isnan(values)).cumsum(axis=1)
+    inside = counts < counts[:, -1:] if values.shape[1] else np.zeros(values.shape, dtype=bool)
+    filled[np.isnan(values) & inside] = fill_value
+    return filled
+
+
+def placebo_significance(sweep, pre_columns=None, after_columns=None):
+    """
+    Test the pre against the post buckets of every row of a placebo sweep in one batched call.
+
+    Parameters:
+        sweep (pd.DataFrame): The output of placebo_sweep.
+        pre_columns (list): The pre bucket columns (default: all 'pre-' columns).
+        after_columns (list): The post bucket columns (default: all 'post-' columns).
+
+    Returns:
+        pd.DataFrame: The key columns of the sweep with cliffs_delta (positive if the post values are higher) and the
+        Mann-Whitney U statistic, p_value and significant flag (NaN if a side has no buckets).
+    """
+    pre_columns = pre_columns or [column for column in sweep.columns if column.startswith('pre-')]
+    after_columns = after_columns or [column for column in sweep.columns if column.startswith('post-')]
+    key_columns = [column for column in sweep.columns if not column.startswith(('pre-', 'post-'))]
+
+    pre_values = sweep[pre_columns].to_numpy(dtype=float)
+    after_values = sweep[after_columns].to_numpy(dtype=float)
+    result = sweep[key_columns].copy()
+    result['cliffs_delta'] = _cliffs_delta_rows(pre_values, after_values)
+
+    result['statistic'], result['p_value'] = _mann_whitney_rows(pre_values, after_values)
+    result['significant'] = result['p_value'] < 0.05
+    return result
+
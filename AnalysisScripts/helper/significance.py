@@ -1,9 +1,12 @@
-from scipy.stats import shapiro, ttest_rel, wilcoxon
 import pandas as pd
 import numpy as np
 from numpy import std, mean, sqrt
+from itertools import combinations
+from math import comb
 
 def check_normality_of_buckets(commit_result_df, pre_columns, after_columns):
+    from scipy.stats import shapiro
+
     # Initialize a list to store results
     results = []
 
@@ -38,7 +41,9 @@ def check_normality_of_buckets(commit_result_df, pre_columns, after_columns):
     return normality_results
 
 
-def use_normality_results_for_significance_dependent(normality_results, commit_result_df, pre_columns, after_columns, reverse=False):
+def use_normality_results_for_significance_dependent(normality_results, commit_result_df, pre_columns, after_columns, reverse=False, verbose=True):
+    from scipy.stats import ttest_rel, wilcoxon
+
     significance_results = []
     # Loop through each repository
     for _, row in normality_results.iterrows():
@@ -54,7 +59,8 @@ def use_normality_results_for_significance_dependent(normality_results, commit_r
         pre_values = pre_values[valid_mask]
         after_values = after_values[valid_mask]
         
-        print(f"{repo_name}: mean(pre)={np.mean(pre_values):.2f}, mean(after)={np.mean(after_values):.2f}")
+        if verbose:
+            print(f"{repo_name}: mean(pre)={np.mean(pre_values):.2f}, mean(after)={np.mean(after_values):.2f}")
 
 
         if len(pre_columns) != len(after_columns):
@@ -133,7 +139,10 @@ def calculate_cliffs_delta(commit_result_df, pre_columns, after_columns, reverse
 
 import numpy as np
 import pandas as pd
-from sklearn.utils import resample
+
+def _resample(values):
+    # Bootstrap sample drawn from NumPy's global random state, identical to sklearn.utils.resample(values)
+    return values[np.random.randint(0, len(values), size=len(values))]
 
 def calculate_cliffs_delta_with_confidence(commit_result_df, pre_columns, after_columns, reverse=False, n_boot=1000, alpha=0.05):
     significance_results = []
@@ -166,8 +175,8 @@ def calculate_cliffs_delta_with_confidence(commit_result_df, pre_columns, after_
         # Bootstrap
         deltas = []
         for _ in range(n_boot):
-            boot_pre = resample(pre_values)
-            boot_post = resample(after_values)
+            boot_pre = _resample(pre_values)
+            boot_post = _resample(after_values)
             try:
                 boot_delta = cliffs_delta(boot_pre, boot_post)
                 deltas.append(boot_delta)
@@ -191,10 +200,11 @@ def calculate_cliffs_delta_with_confidence(commit_result_df, pre_columns, after_
     return pd.DataFrame(significance_results)
 
 
-from scipy.stats import ttest_ind, mannwhitneyu
 from math import sqrt, isnan
 
-def use_normality_results_for_significance_independent(normality_results, commit_result_df, pre_columns, after_columns):
+def use_normality_results_for_significance_independent(normality_results, commit_result_df, pre_columns, after_columns, verbose=True):
+    from scipy.stats import mannwhitneyu
+
     significance_results = []
     
     # Loop through each repository
@@ -207,10 +217,12 @@ def use_normality_results_for_significance_independent(normality_results, commit
         pre_values = pre_values[~np.isnan(pre_values)]
         after_values = after_values[~np.isnan(after_values)]
 
-        print(f"{repo_name}: mean(pre)={np.mean(pre_values):.2f}, mean(after)={np.mean(after_values):.2f}, len(pre)={len(pre_values)}, len(after)={len(after_values)}")
+        if verbose:
+            print(f"{repo_name}: mean(pre)={np.mean(pre_values):.2f}, mean(after)={np.mean(after_values):.2f}, len(pre)={len(pre_values)}, len(after)={len(after_values)}")
 
         if len(pre_values) == 0 or len(after_values) == 0:
-            print(f"Skipping {repo_name} due to insufficient data.")
+            if verbose:
+                print(f"Skipping {repo_name} due to insufficient data.")
             continue
 
         # if row['pre_normal'] and row['after_normal']:
@@ -261,3 +273,422 @@ def use_normality_results_for_significance_independent(normality_results, commit
 
     significance_results_df = pd.DataFrame(significance_results)
     return significance_results_df
+
+
+def stack_repository_values(commit_result_df, repositories, columns, reverse=False, width=None):
+    """
+    Stack the bucket values of several repositories into a NaN-padded 2-D array.
+
+    Parameters:
+        commit_result_df (pd.DataFrame): The bucket table with a 'repository' column.
+        repositories (list): The repositories to stack; defines the row order.
+        columns (list): The bucket columns to flatten per repository.
+        reverse (bool): Whether to reverse the flattened values of each repository.
+        width (int): The number of columns of the result; defaults to the longest row.
+
+    Returns:
+        np.ndarray: A float array of shape (len(repositories), width), padded with NaN.
+    """
+    row_positions = commit_result_df.groupby('repository', sort=False).indices
+    values = commit_result_df[columns].to_numpy(dtype=float)
+
+    rows = []
+    for repo_name in repositories:
+        positions = row_positions.get(repo_name, [])
+        flattened = values[positions].flatten()
+        rows.append(flattened[::-1] if reverse else flattened)
+
+    if width is None:
+        width = max((len(row) for row in rows), default=0)
+
+    stacked = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        stacked[i, :min(len(row), width)] = row[:width]
+    return stacked
+
+
+def use_normality_results_for_significance_dependent_batched(normality_results, commit_result_df, pre_columns, after_columns, reverse=False, verbose=False):
+    """
+    Batched variant of use_normality_results_for_significance_dependent.
+
+    All repositories are stacked into padded 2-D arrays and tested in one call per
+    test type (paired t-test for normal repositories) or per group of repositories for
+    which scipy picks the same Wilcoxon method (non-normal repositories, see _wilcoxon_rows).
+    Pairs where either value is NaN are omitted per repository.
+
+    Parameters:
+        normality_results (pd.DataFrame): Output of check_normality_of_buckets.
+        commit_result_df (pd.DataFrame): The bucket table with a 'repository' column.
+        pre_columns (list): The bucket columns before the introduction date.
+        after_columns (list): The bucket columns after the introduction date.
+        reverse (bool): Whether to reverse the after values of each repository.
+        verbose (bool): Whether to print the per-repository means.
+
+    Returns:
+        pd.DataFrame: One row per repository with test_used, statistic, p_value, significant and effect_size.
+    """
+    from scipy.stats import ttest_rel
+
+    repositories = list(normality_results['repository'])
+    pre_values = stack_repository_values(commit_result_df, repositories, pre_columns)
+    after_values = stack_repository_values(commit_result_df, repositories, after_columns, reverse=reverse)
+
+    # Pad both sides to the same width so that values are paired by position
+    width = max(pre_values.shape[1], after_values.shape[1])
+    pre_values = np.pad(pre_values, ((0, 0), (0, width - pre_values.shape[1])), constant_values=np.nan)
+    after_values = np.pad(after_values, ((0, 0), (0, width - after_values.shape[1])), constant_values=np.nan)
+
+    # Keep only complete pairs, so both sides share the same mask
+    valid_mask = ~np.isnan(pre_values) & ~np.isnan(after_values)
+    pre_values = np.where(valid_mask, pre_values, np.nan)
+    after_values = np.where(valid_mask, after_values, np.nan)
+    n = valid_mask.sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pre_means = np.nanmean(pre_values, axis=1)
+        after_means = np.nanmean(after_values, axis=1)
+
+    if verbose:
+        for repo_name, pre_mean, after_mean in zip(repositories, pre_means, after_means):
+            print(f"{repo_name}: mean(pre)={pre_mean:.2f}, mean(after)={after_mean:.2f}")
+
+    normal = (normality_results['pre_normal'].to_numpy(dtype=bool) & normality_results['after_normal'].to_numpy(dtype=bool))
+    statistics = np.full(len(repositories), np.nan)
+    p_values = np.full(len(repositories), np.nan)
+    effect_sizes = np.full(len(repositories), np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if normal.any():
+            # Paired t-test for normal data, Cohen's d as effect size
+            result = ttest_rel(pre_values[normal], after_values[normal], axis=1, nan_policy='omit')
+            statistics[normal] = result.statistic
+            p_values[normal] = result.pvalue
+
+            n_normal = n[normal]
+            pre_std = np.nanstd(pre_values[normal], axis=1, ddof=1)
+            after_std = np.nanstd(after_values[normal], axis=1, ddof=1)
+            pooled = np.sqrt(((n_normal - 1) * pre_std ** 2 + (n_normal - 1) * after_std ** 2) / (2 * n_normal - 2))
+            effect_sizes[normal] = (pre_means[normal] - after_means[normal]) / pooled
+
+        if (~normal).any():
+            # Wilcoxon signed-rank test for non-normal data, r as effect size
+            statistics[~normal], p_values[~normal] = _wilcoxon_rows(pre_values[~normal], after_values[~normal])
+
+            n_other = n[~normal]
+            mean_w = n_other * (n_other + 1) / 4
+            std_w = np.sqrt(n_other * (n_other + 1) * (2 * n_other + 1) / 24)
+            z = (statistics[~normal] - mean_w) / std_w
+            effect_sizes[~normal] = z / np.sqrt(n_other)
+
+    return pd.DataFrame({
+        'repository': repositories,
+        'test_used': np.where(normal, "t-test (ES Cohens d)", "Wilcoxon (ES r)"),
+        'statistic': statistics,
+        'p_value': p_values,
+        'significant': p_values < 0.05,
+        'effect_size': effect_sizes
+    })
+
+
+def _wilcoxon_rows(pre_values, after_values):
+    """
+    Wilcoxon signed-rank test of every row of two NaN-padded arrays, equal to one wilcoxon call per row.
+
+    scipy chooses between the exact, the permutation and the asymptotic test once per call, depending on the
+    number of pairs and on ties or zero differences anywhere in the batch; nan_policy='omit' falls back to one
+    call per row. The complete pairs of every row are therefore moved to the front, the rows are grouped by
+    their number of pairs and by whether they have ties or zero differences, and every group is tested in one
+    call without NaNs.
+
+    Parameters:
+        pre_values (np.ndarray): The pre values, shape (rows, buckets), NaN where a pair is incomplete.
+        after_values (np.ndarray): The after values of the same shape.
+
+    Returns:
+        tuple: The statistics and the p-values (NaN for rows without complete pairs).
+    """
+    from scipy.stats import wilcoxon
+
+    valid = ~np.isnan(pre_values) & ~np.isnan(after_values)
+    # Stable order: the complete pairs first (the test does not depend on the order of the pairs)
+    order = np.argsort(~valid, axis=1, kind='stable')
+    pre_values = np.take_along_axis(pre_values, order, axis=1)
+    after_values = np.take_along_axis(after_values, order, axis=1)
+    n = valid.sum(axis=1)
+    statistic = np.full(len(pre_values), np.nan)
+    p_value = np.full(len(pre_values), np.nan)
+
+    differences = np.where(np.take_along_axis(valid, order, axis=1), pre_values - after_values, np.nan)
+    # Equal neighbours of the sorted absolute differences are ties (differences involving NaN are never 0)
+    ties = (np.diff(np.sort(np.abs(differences), axis=1), axis=1) == 0).any(axis=1) | (differences == 0).any(axis=1)
+
+    keys = pd.DataFrame({'n': n, 'ties': ties})
+    for (size, _), rows in keys.groupby(['n', 'ties']).indices.items():
+        if size == 0:
+            continue
+        statistic[rows], p_value[rows] = wilcoxon(pre_values[rows, :size], after_values[rows, :size], axis=1)
+    return statistic, p_value
+
+def use_normality_results_for_significance_independent_batched(normality_results, commit_result_df, pre_columns, after_columns, verbose=False):
+    """
+    Batched variant of use_normality_results_for_significance_independent.
+
+    All repositories are stacked into padded 2-D arrays and tested with one
+    Mann-Whitney U call per group of repositories for which scipy picks the same
+    method (see _mann_whitney_rows). NaNs are omitted independently on both sides;
+    repositories without data on either side are skipped.
+
+    Parameters:
+        normality_results (pd.DataFrame): Output of check_normality_of_buckets.
+        commit_result_df (pd.DataFrame): The bucket table with a 'repository' column.
+        pre_columns (list): The bucket columns before the introduction date.
+        after_columns (list): The bucket columns after the introduction date.
+        verbose (bool): Whether to print the per-repository means and sample sizes.
+
+    Returns:
+        pd.DataFrame: One row per repository with test_used, statistic, p_value, significant and effect_size.
+    """
+    repositories = list(normality_results['repository'])
+    pre_values = stack_repository_values(commit_result_df, repositories, pre_columns)
+    after_values = stack_repository_values(commit_result_df, repositories, after_columns)
+
+    n_pre = (~np.isnan(pre_values)).sum(axis=1)
+    n_after = (~np.isnan(after_values)).sum(axis=1)
+
+    if verbose:
+        with np.errstate(invalid='ignore'):
+            pre_means = np.nanmean(pre_values, axis=1) if pre_values.size else np.full(len(repositories), np.nan)
+            after_means = np.nanmean(after_values, axis=1) if after_values.size else np.full(len(repositories), np.nan)
+        for repo_name, pre_mean, after_mean, pre_len, after_len in zip(repositories, pre_means, after_means, n_pre, n_after):
+            print(f"{repo_name}: mean(pre)={pre_mean:.2f}, mean(after)={after_mean:.2f}, len(pre)={pre_len}, len(after)={after_len}")
+            if pre_len == 0 or after_len == 0:
+                print(f"Skipping {repo_name} due to insufficient data.")
+
+    has_data = (n_pre > 0) & (n_after > 0)
+    repositories = [repo_name for repo_name, keep in zip(repositories, has_data) if keep]
+    pre_values, after_values = pre_values[has_data], after_values[has_data]
+    n1, n2 = n_after[has_data], n_pre[has_data]
+
+    if not repositories:
+        return pd.DataFrame()
+
+    stat, p_values = _mann_whitney_rows(pre_values, after_values)
+    rank_biserial = 1 - (2 * stat) / (n1 * n2)
+
+    return pd.DataFrame({
+        'repository': repositories,
+        'test_used': "Mann-Whitney U (ES rank-biserial)",
+        'statistic': stat,
+        'p_value': p_values,
+        'significant': p_values < 0.05,
+        'effect_size': rank_biserial
+    })
+
+
+
+def _mann_whitney_rows(pre_values, after_values):
+    """
+    Two-sided Mann-Whitney U test of every row of two NaN-padded arrays, equal to one mannwhitneyu call per row.
+
+    With method='auto', scipy chooses between the exact and the asymptotic test once per call: the exact test
+    only if a sample has at most 8 values and there are no ties. A single call over all rows would let one row
+    with ties switch every row to the asymptotic p-values, and nan_policy='omit' falls back to one call per row.
+    The rows are therefore grouped by their sample sizes and, for small samples, by whether they contain ties,
+    and every group is tested in one call without NaNs.
+
+    Parameters:
+        pre_values (np.ndarray): The pre values, shape (rows, buckets), NaN-padded.
+        after_values (np.ndarray): The after values, shape (rows, buckets), NaN-padded.
+
+    Returns:
+        tuple: The U statistics of the pre values and the p-values (NaN for rows without data on a side).
+    """
+    from scipy.stats import mannwhitneyu
+
+    # NaNs sort to the end, so the first n values of a row are its samples (the test does not depend on their order)
+    pre_values, after_values = np.sort(pre_values, axis=1), np.sort(after_values, axis=1)
+    n_pre = (~np.isnan(pre_values)).sum(axis=1)
+    n_after = (~np.isnan(after_values)).sum(axis=1)
+    statistic = np.full(len(pre_values), np.nan)
+    p_value = np.full(len(pre_values), np.nan)
+
+    # Equal neighbours in the sorted pooled row are ties (differences involving NaN are never 0)
+    pooled = np.sort(np.hstack([pre_values, after_values]), axis=1)
+    ties = (np.diff(pooled, axis=1) == 0).any(axis=1)
+    small = (n_pre <= 8) | (n_after <= 8)
+
+    keys = pd.DataFrame({'n_pre': n_pre, 'n_after': n_after, 'ties': ties & small})
+    for (pre_size, after_size, _), rows in keys.groupby(['n_pre', 'n_after', 'ties']).indices.items():
+        if pre_size == 0 or after_size == 0:
+            continue
+        statistic[rows], p_value[rows] = mannwhitneyu(pre_values[rows, :pre_size], after_values[rows, :after_size],
+                                                      axis=1, alternative='two-sided', method='auto')
+    return statistic, p_value
+
+PERMUTATION_STATISTICS = {
+    'mean': np.mean,
+    'median': np.median,
+}
+
+
+def generate_label_permutations(n_total, n_first, n_resamples=9999, max_exact=100000, random_state=0):
+    """
+    Generate label permutations for a two-sample permutation test as an index matrix.
+
+    If C(n_total, n_first) <= max_exact, all permutations are enumerated exactly,
+    otherwise n_resamples random permutations are drawn with a seeded generator.
+
+    Parameters:
+        n_total (int): The number of pooled observations.
+        n_first (int): The number of observations labelled as the first sample.
+        n_resamples (int): The number of Monte-Carlo permutations.
+        max_exact (int): The maximum number of permutations to enumerate exactly.
+        random_state (int or np.random.Generator): Seed or generator for Monte-Carlo permutations.
+
+    Returns:
+        tuple: An int array of shape (n_permutations, n_total) whose first n_first columns index the
+            first sample, and a boolean that is True if the permutations are exact.
+    """
+    if comb(n_total, n_first) <= max_exact:
+        first = np.array(list(combinations(range(n_total), n_first)), dtype=np.intp).reshape(-1, n_first)
+        remaining = np.ones((len(first), n_total), dtype=bool)
+        remaining[np.arange(len(first))[:, None], first] = False
+        second = np.nonzero(remaining)[1].reshape(len(first), n_total - n_first)
+        return np.hstack([first, second]), True
+
+    rng = np.random.default_rng(random_state)
+    return np.argsort(rng.random((n_resamples, n_total)), axis=1), False
+
+
+def generate_sign_flips(n_pairs, n_resamples=9999, max_exact=100000, random_state=0):
+    """
+    Generate sign flips for a paired permutation test as a +1/-1 matrix.
+
+    If 2 ** n_pairs <= max_exact, all sign combinations are enumerated exactly,
+    otherwise n_resamples random sign vectors are drawn with a seeded generator.
+
+    Parameters:
+        n_pairs (int): The number of pairs.
+        n_resamples (int): The number of Monte-Carlo sign vectors.
+        max_exact (int): The maximum number of sign combinations to enumerate exactly.
+        random_state (int or np.random.Generator): Seed or generator for Monte-Carlo sign vectors.
+
+    Returns:
+        tuple: A float array of shape (n_permutations, n_pairs) and a boolean that is True if exact.
+    """
+    if 2 ** n_pairs <= max_exact:
+        bits = (np.arange(2 ** n_pairs)[:, None] >> np.arange(n_pairs)[None, :]) & 1
+        return 1.0 - 2.0 * bits, True
+
+    rng = np.random.default_rng(random_state)
+    return rng.choice([-1.0, 1.0], size=(n_resamples, n_pairs)), False
+
+
+def _permutation_p_values(observed, permuted, exact):
+    # Two-sided p-values; the small tolerance keeps ties with the observed statistic
+    at_least_as_extreme = np.abs(permuted) >= np.abs(observed)[:, None] * (1 - 1e-12)
+    count = at_least_as_extreme.sum(axis=1)
+    if exact:
+        return count / permuted.shape[1]
+    return (count + 1) / (permuted.shape[1] + 1)
+
+
+def _cliffs_delta_rows(pre_values, after_values):
+    # Cliff's delta per row of two NaN-padded arrays, positive if the after values are higher
+    comparison = np.sign(after_values[:, None, :] - pre_values[:, :, None])
+    with np.errstate(invalid='ignore'):
+        return np.nanmean(comparison.reshape(len(comparison), -1), axis=1)
+
+
+def permutation_test_for_significance(commit_result_df, pre_columns, after_columns, paired=False, statistic='mean', n_resamples=9999, max_exact=100000, random_state=0, batch_size=10000):
+    """
+    Permutation test of the difference between pre and after buckets for every repository.
+
+    Independent samples are tested by permuting the pre/after labels, paired samples by flipping
+    the signs of the differences. Permutations are enumerated exactly if their number is at most
+    max_exact and drawn from a seeded generator otherwise. Repositories with the same sample sizes
+    share one permutation matrix and the statistic of every permutation is computed in one
+    vectorized pass (in chunks of batch_size permutations).
+
+    Parameters:
+        commit_result_df (pd.DataFrame): The bucket table with a 'repository' column.
+        pre_columns (list): The bucket columns before the introduction date.
+        after_columns (list): The bucket columns after the introduction date.
+        paired (bool): Whether to treat the buckets as paired samples.
+        statistic (str): The location statistic to compare, 'mean' or 'median'.
+        n_resamples (int): The number of Monte-Carlo permutations.
+        max_exact (int): The maximum number of permutations to enumerate exactly.
+        random_state (int): Seed for the Monte-Carlo permutations.
+        batch_size (int): The number of permutations evaluated at once.
+
+    Returns:
+        pd.DataFrame: One row per repository with test_used, statistic, p_value, significant and effect_size (Cliff's Delta).
+    """
+    statistic_function = PERMUTATION_STATISTICS[statistic]
+    rng = np.random.default_rng(random_state)
+
+    repositories = list(commit_result_df['repository'].unique())
+    pre_values = stack_repository_values(commit_result_df, repositories, pre_columns)
+    after_values = stack_repository_values(commit_result_df, repositories, after_columns)
+
+    if paired:
+        width = max(pre_values.shape[1], after_values.shape[1])
+        pre_values = np.pad(pre_values, ((0, 0), (0, width - pre_values.shape[1])), constant_values=np.nan)
+        after_values = np.pad(after_values, ((0, 0), (0, width - after_values.shape[1])), constant_values=np.nan)
+        valid_mask = ~np.isnan(pre_values) & ~np.isnan(after_values)
+        pre_values = np.where(valid_mask, pre_values, np.nan)
+        after_values = np.where(valid_mask, after_values, np.nan)
+
+    statistics = np.full(len(repositories), np.nan)
+    p_values = np.full(len(repositories), np.nan)
+    test_used = np.full(len(repositories), "", dtype=object)
+
+    # Move the valid values of each row to the front, so rows of equal size can be sliced together
+    pre_sorted = np.take_along_axis(pre_values, np.argsort(np.isnan(pre_values), axis=1, kind='stable'), axis=1)
+    after_sorted = np.take_along_axis(after_values, np.argsort(np.isnan(after_values), axis=1, kind='stable'), axis=1)
+    n_pre = (~np.isnan(pre_values)).sum(axis=1)
+    n_after = (~np.isnan(after_values)).sum(axis=1)
+
+    for n1, n2 in sorted(set(zip(n_pre, n_after))):
+        if n1 == 0 or n2 == 0:
+            continue
+        rows = np.nonzero((n_pre == n1) & (n_after == n2))[0]
+        pre_block = pre_sorted[rows, :n1]
+        after_block = after_sorted[rows, :n2]
+
+        if paired:
+            differences = after_block - pre_block
+            observed = statistic_function(differences, axis=1)
+            signs, exact = generate_sign_flips(n1, n_resamples, max_exact, rng)
+            permuted = np.concatenate([
+                statistic_function(differences[:, None, :] * signs[None, start:start + batch_size, :], axis=2)
+                for start in range(0, len(signs), batch_size)
+            ], axis=1)
+        else:
+            pooled = np.hstack([pre_block, after_block])
+            observed = statistic_function(after_block, axis=1) - statistic_function(pre_block, axis=1)
+            permutations, exact = generate_label_permutations(n1 + n2, n1, n_resamples, max_exact, rng)
+            permuted_batches = []
+            for start in range(0, len(permutations), batch_size):
+                relabelled = pooled[:, permutations[start:start + batch_size]]
+                permuted_batches.append(statistic_function(relabelled[:, :, n1:], axis=2) - statistic_function(relabelled[:, :, :n1], axis=2))
+            permuted = np.concatenate(permuted_batches, axis=1)
+
+        statistics[rows] = observed
+        p_values[rows] = _permutation_p_values(observed, permuted, exact)
+        test_used[rows] = f"Permutation ({'paired' if paired else 'independent'}, {'exact' if exact else 'Monte-Carlo'}, ES Cliff's Delta)"
+
+    has_data = (n_pre > 0) & (n_after > 0)
+    return pd.DataFrame({
+        'repository': repositories,
+        'test_used': test_used,
+        'statistic': statistics,
+        'p_value': p_values,
+        'significant': p_values < 0.05,
+        'effect_size': _cliffs_delta_rows(pre_values, after_values)
+    })[has_data].reset_index(drop=True)
+
+
+# Record the calls of the public functions if ANALYSIS_PROFILE is set (see helper.instrumentation)
+from helper.instrumentation import instrument_functions  # noqa: E402
+instrument_functions(globals(), __name__)
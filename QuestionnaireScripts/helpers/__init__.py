@@ -0,0 +1,30 @@
+"""
+Plotting helpers for the questionnaire notebooks.
+
+Submodules are imported on first access (e.g. ``helpers.likert_charts``), and the plotting libraries they
+use are only imported when a chart is drawn, so importing the package itself is cheap.
+"""
+import importlib
+
+__all__ = [
+    'aggregation',
+    'bar_charts',
+    'batch_rendering',
+    'colormap_factory',
+    'display_colormap_gradients',
+    'helpers',
+    'likert_charts',
+    'line_charts',
+    'scatter_charts',
+    'violin_plots',
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
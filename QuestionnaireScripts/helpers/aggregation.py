@@ -0,0 +1,151 @@
+"""
+Shared group/aggregate engine for the grouped charts in line_charts.py.
+
+The charts all follow the same sequence: group the raw frame by a group column and an aggregate column,
+move small groups into an 'others' group, aggregate again and pivot. ``GroupedAggregation`` runs the
+expensive groupby over the raw frame once per statistic and derives every thresholded pivot from these
+per-cell statistics, so several chart variants of one dataset share a single aggregation pass:
+
+    aggregation = GroupedAggregation(df, 'intention', 'condition_name', value_column='length')
+    plot_aggregated_line_chart(aggregation, threshold=5)
+    plot_percentage_stacked_bar_chart(aggregation, threshold=10)
+    plot_average_chart(aggregation)
+"""
+
+
+class GroupedAggregation:
+    """
+    Per-cell statistics of a frame grouped by (group_column, aggregate_column) with cached pivots.
+
+    The cell statistics (counts, sums, means, medians of value_column) are computed on first use; the
+    pivots are cached per threshold and returned as copies, so the charts may modify them.
+    """
+
+    def __init__(self, df, group_column, aggregate_column, value_column=None):
+        """
+        :param df: Pandas DataFrame containing the data.
+        :param group_column: The column name to group by (e.g., 'intention').
+        :param aggregate_column: The column name to aggregate on (e.g., 'condition_name').
+        :param value_column: The column that is summed, averaged or reduced to its median (optional).
+        """
+        self.group_column = group_column
+        self.aggregate_column = aggregate_column
+        self.value_column = value_column
+        self._df = df
+        self._cells = {}
+        self._pivots = {}
+
+    def matches(self, group_column=None, aggregate_column=None, value_column=None):
+        """
+        Check whether the given columns (None matches any column) are the ones of this aggregation.
+        """
+        return all(column is None or column == own for column, own in
+                   [(group_column, self.group_column), (aggregate_column, self.aggregate_column), (value_column, self.value_column)])
+
+    def _cell_statistic(self, statistic):
+        """
+        Returns a Series with the statistic per (group, aggregate) cell, computed once from the raw frame.
+
+        :param statistic: 'count', 'sum', 'mean', 'median' or 'group_size' (the number of rows per group).
+        """
+        if statistic not in self._cells:
+            if statistic == 'group_size':
+                self._cells[statistic] = self._df[self.group_column].value_counts()
+            elif statistic == 'count':
+                self._cells[statistic] = self._df.groupby([self.group_column, self.aggregate_column]).size()
+            else:
+                if self.value_column is None:
+                    raise ValueError(f"A value_column is required for the '{statistic}' statistic.")
+                grouped = self._df.groupby([self.group_column, self.aggregate_column])[self.value_column]
+                self._cells[statistic] = grouped.agg(statistic)
+        return self._cells[statistic]
+
+    def _pivot(self, cells, group_labels, reduce):
+        """
+        Regroup the cells by new group labels, reduce them and pivot the aggregate column into columns.
+        """
+        regrouped = cells.groupby([group_labels, cells.index.get_level_values(1)]).agg(reduce)
+        regrouped.index.names = [self.group_column, self.aggregate_column]
+        return regrouped.unstack(self.aggregate_column)
+
+    def _cached(self, key, compute):
+        if key not in self._pivots:
+            self._pivots[key] = compute()
+        return self._pivots[key].copy()
+
+    def _relabel(self, cells, relabel):
+        groups = cells.index.get_level_values(0)
+        return groups if relabel is None else groups.map(relabel)
+
+    def count_pivot(self, threshold=5, others_label='others', relabel=None):
+        """
+        Returns the counts per group (rows) and aggregate value (columns). Groups with a total count
+        <= threshold are summed into others_label.
+
+        :param threshold: The threshold for filtering; groups with a total count <= this will be aggregated into others_label.
+        :param others_label: The label of the aggregated small groups.
+        :param relabel: An optional function applied to the group labels before thresholding (groups mapped to the same label are merged).
+        :return: The pivot DataFrame.
+        """
+        def compute():
+            cells = self._cell_statistic('count')
+            groups = self._relabel(cells, relabel)
+            totals = cells.groupby(groups).sum()
+            relevant = groups.isin(totals.index[totals > threshold])
+            return self._pivot(cells, groups.where(relevant, others_label), 'sum')
+
+        return self._cached(('count', threshold, others_label, relabel), compute)
+
+    def sum_pivot(self, threshold=5, others_label='others'):
+        """
+        Returns the sum of value_column per group and aggregate value. Groups whose summed values are
+        <= threshold are summed into others_label.
+        """
+        def compute():
+            cells = self._cell_statistic('sum')
+            groups = cells.index.get_level_values(0)
+            relevant = cells.groupby(level=0).transform('sum').to_numpy() > threshold
+            return self._pivot(cells, groups.where(relevant, others_label), 'sum')
+
+        return self._cached(('sum', threshold, others_label), compute)
+
+    def mean_pivot(self, threshold=5, others_label='others'):
+        """
+        Returns the mean of value_column per group and aggregate value. Groups with <= threshold rows are
+        merged into others_label, whose value is the mean of the merged cell means.
+        """
+        return self._cached(('mean', threshold, others_label), lambda: self._small_groups_pivot('mean', threshold, others_label))
+
+    def median_pivot(self, threshold=5, others_label='others'):
+        """
+        Returns the median of value_column per group and aggregate value. Groups with <= threshold rows are
+        merged into others_label, whose value is the median of the merged cell medians.
+        """
+        return self._cached(('median', threshold, others_label), lambda: self._small_groups_pivot('median', threshold, others_label))
+
+    def _small_groups_pivot(self, statistic, threshold, others_label):
+        cells = self._cell_statistic(statistic)
+        sizes = self._cell_statistic('group_size')
+        groups = cells.index.get_level_values(0)
+        small = groups.isin(sizes.index[sizes <= threshold])
+        return self._pivot(cells, groups.where(~small, others_label), statistic)
+
+
+def resolve_aggregation(df, group_column=None, aggregate_column=None, value_column=None):
+    """
+    Returns a GroupedAggregation for a chart function that accepts either a raw DataFrame or an aggregation.
+
+    :param df: A Pandas DataFrame or a GroupedAggregation.
+    :param group_column: The column name to group by (optional for an aggregation).
+    :param aggregate_column: The column name to aggregate on (optional for an aggregation).
+    :param value_column: The value column (optional for an aggregation).
+    :return: The GroupedAggregation.
+    """
+    if isinstance(df, GroupedAggregation):
+        if not df.matches(group_column, aggregate_column, value_column):
+            raise ValueError(f"The aggregation is grouped by ({df.group_column}, {df.aggregate_column}, {df.value_column}), "
+                             f"not by ({group_column}, {aggregate_column}, {value_column}).")
+        return df
+    if group_column is None or aggregate_column is None:
+        raise ValueError('group_column and aggregate_column are required for a DataFrame.')
+    return GroupedAggregation(df, group_column, aggregate_column, value_column)
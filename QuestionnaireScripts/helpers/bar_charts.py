@@ -1,11 +1,13 @@
+import math
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-import matplotlib.colors
-import seaborn as sns
 import numpy as np
-from matplotlib import dates as mdates
 from .colormap_factory import get_default_colormap
+from .lazy_imports import lazy_import
+
+plt = lazy_import('matplotlib.pyplot')
+matplotlib = lazy_import('matplotlib')
+sns = lazy_import('seaborn')
+mdates = lazy_import('matplotlib.dates')
 
 # Enum of all bar chart types
 class ChartType:
@@ -139,8 +141,103 @@ def plot_frequency_of_responses_bar(column, title, chart_type, file_path, legend
     if file_path:
         plt.savefig(file_path, bbox_inches='tight')  # Save the figure
         
+def bin_daily_counts(dates):
+    """
+    Count events per day with a single np.bincount over the day offsets.
+
+    :param dates: A Series (or array) of event timestamps.
+    :return: A Series with the number of events per day, indexed by every day from the first to the last event.
+    """
+    dates = pd.to_datetime(pd.Series(dates)).dropna()
+    if dates.empty:
+        return pd.Series(dtype=np.int64)
+
+    days = dates.dt.floor('D')
+    first_day = days.min()
+    offsets = ((days - first_day) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+    counts = np.bincount(offsets)
+    return pd.Series(counts, index=pd.date_range(first_day, periods=len(counts), freq='D'))
+
+def fft_kde(daily_counts, bw_adjust=1):
+    """
+    Evaluate a Gaussian KDE of binned daily counts on the daily grid via FFT convolution.
+
+    The bandwidth follows Scott's rule like the KDE of sns.histplot, with the events' variance
+    estimated from the bins (plus the within-day variance of 1/12 day^2).
+
+    :param daily_counts: The output of bin_daily_counts.
+    :param bw_adjust: Factor that scales the bandwidth, as in seaborn.
+    :return: The density (per day) at the center of every day; it integrates to 1.
+    """
+    counts = daily_counts.to_numpy(dtype=float)
+    n_days, n_events = len(counts), counts.sum()
+    if n_events < 2:
+        return np.zeros(n_days)
+
+    centers = np.arange(n_days) + 0.5
+    mean = np.dot(counts, centers) / n_events
+    variance = np.dot(counts, (centers - mean) ** 2) / (n_events - 1) + 1 / 12
+    bandwidth = bw_adjust * n_events ** (-1. / 5) * np.sqrt(variance)
+
+    # Kernel mass per day offset (integrated over the day), truncated at 5 bandwidths
+    half_width = int(np.ceil(5 * bandwidth)) + 1
+    offsets = np.arange(-half_width, half_width + 1)
+    erf = np.vectorize(math.erf)
+    cdf = 0.5 * (1 + erf((np.append(offsets, half_width + 1) - 0.5) / (bandwidth * np.sqrt(2))))
+    kernel = np.diff(cdf)
+
+    # Linear (not circular) convolution of the counts with the kernel
+    size = 1 << int(np.ceil(np.log2(n_days + len(kernel))))
+    convolved = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    density = convolved[half_width:half_width + n_days] / n_events
+    return np.clip(density, 0, None)
+
+def _daily_bin_edges(daily_counts, bins=None):
+    # Bin edges in day units relative to the first day, matching numpy's 'auto' rule for the raw events
+    n_days, n_events = len(daily_counts), daily_counts.sum()
+    if bins is not None and np.ndim(bins) > 0:
+        return np.asarray(bins, dtype=float)
+    if bins is not None:
+        return np.linspace(0, n_days, int(bins) + 1)
+
+    cumulative = np.cumsum(daily_counts.to_numpy())
+    quartile1, quartile3 = (np.searchsorted(cumulative, n_events * q) + 0.5 for q in (0.25, 0.75))
+    fd_width = 2 * (quartile3 - quartile1) * n_events ** (-1. / 3)
+    sqrt_width = n_days / np.sqrt(n_events)
+    sturges_width = n_days / (np.log2(n_events) + 1)
+    width = min(max(fd_width, sqrt_width / 2), sturges_width)
+    return np.linspace(0, n_days, max(1, int(np.ceil(n_days / width))) + 1)
+
+def _plot_binned_hist_with_kde(daily_counts, ax, bins=None, kde=True, color='#77B5FE'):
+    """
+    Draw the histogram (and KDE) of pre-binned daily counts like sns.histplot(kde=True) does for the raw events.
+
+    :param daily_counts: The output of bin_daily_counts.
+    :param ax: The axes to draw on.
+    :param bins: None (numpy's 'auto' rule), the number of bins or the bin edges in days relative to the first day.
+    :param kde: Whether to draw the KDE line.
+    :param color: The color of the bars and the line.
+    """
+    first_day = daily_counts.index[0]
+    edges = _daily_bin_edges(daily_counts, bins)
+
+    # Events are spread uniformly within their day, so bins need not align with days
+    cumulative = np.concatenate([[0], np.cumsum(daily_counts.to_numpy(dtype=float))])
+    heights = np.diff(np.interp(edges, np.arange(len(cumulative)), cumulative))
+    bin_centers = first_day + pd.to_timedelta((edges[:-1] + edges[1:]) / 2, unit='D')
+    numeric_edges = mdates.date2num(first_day) + edges
+
+    # Bins as a list, seaborn compares them to 'auto'; the alpha is seaborn's default for histograms with a KDE
+    sns.histplot(x=bin_centers, weights=heights, bins=list(numeric_edges), color=color, alpha=.5 if kde else .75, ax=ax)
+
+    if kde:
+        # Scale the density to the histogram's counts, like seaborn does
+        hist_norm = daily_counts.sum() * (edges[1] - edges[0])
+        day_centers = first_day + pd.to_timedelta(np.arange(len(daily_counts)) + 0.5, unit='D')
+        ax.plot(day_centers, fft_kde(daily_counts) * hist_norm, color=color)
+
 # Function to plot KDE over a histogram with optional vertical lines and labels for specific dates
-def plot_kde_over_hist(df, date_column, figsize=(10, 6), title=None, path=None, xlabel='', ylabel='', bins=None, kde=True, highlight_dates=None):
+def plot_kde_over_hist(df, date_column, figsize=(10, 6), title=None, path=None, xlabel='', ylabel='', bins=None, kde=True, highlight_dates=None, daily_counts=None, binned=False):
     """
     Plot a KDE over a bar chart with optional vertical lines and labels for specific dates.
 
@@ -150,11 +247,18 @@ def plot_kde_over_hist(df, date_column, figsize=(10, 6), title=None, path=None,
     :param title: Title of the chart.
     :param path: Path to save the plot.
     :param highlight_dates: List of dates to highlight with vertical lines and labels.
+    :param daily_counts: Pre-binned daily counts (see bin_daily_counts); df may then be None.
+    :param binned: Whether to bin df[date_column] into daily counts and use an FFT-based KDE instead of a KDE over every event.
     """
     plt.figure(figsize=figsize)
 
+    if binned and daily_counts is None:
+        daily_counts = bin_daily_counts(df[date_column])
+
     # Histogram with KDE plot
-    if bins is not None:
+    if daily_counts is not None:
+        _plot_binned_hist_with_kde(daily_counts, plt.gca(), bins=bins, kde=kde)
+    elif bins is not None:
         sns.histplot(df, x=date_column, kde=kde, color='#77B5FE', bins=bins)
     else:
         sns.histplot(df, x=date_column, kde=kde, color='#77B5FE')
@@ -194,14 +298,9 @@ def plot_kde_over_hist(df, date_column, figsize=(10, 6), title=None, path=None,
         plt.show()
 
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-import matplotlib.dates as mdates
-
 # Function to plot KDE over a histogram with optional vertical lines and labels for specific dates
 # and an additional secondary y-axis for overall activity by intention
-def plot_kde_hist_with_activity(df, date_column, activity_df, intention_column, figsize=(10, 6), title=None, path=None, xlabel='', ylabel='', bins=None, kde=True, highlight_dates=None, fontsize=14):
+def plot_kde_hist_with_activity(df, date_column, activity_df, intention_column, figsize=(10, 6), title=None, path=None, xlabel='', ylabel='', bins=None, kde=True, highlight_dates=None, fontsize=14, daily_counts=None, binned=False):
     """
     Plot a KDE over a histogram with optional vertical lines and labels for specific dates
     and a secondary y-axis to represent overall activity by intention using a stacked area chart.
@@ -215,9 +314,14 @@ def plot_kde_hist_with_activity(df, date_column, activity_df, intention_column,
     :param path: Path to save the plot.
     :param highlight_dates: List of dates to highlight with vertical lines and labels.
     :param fontsize: Font size for all text elements.
+    :param daily_counts: Pre-binned daily counts of df (see bin_daily_counts); df may then be None.
+    :param binned: Whether to bin df[date_column] into daily counts and use an FFT-based KDE instead of a KDE over every event.
     """
     # Ensure date columns are in datetime format
-    df[date_column] = pd.to_datetime(df[date_column])
+    if df is not None:
+        df[date_column] = pd.to_datetime(df[date_column])
+    if binned and daily_counts is None:
+        daily_counts = bin_daily_counts(df[date_column])
     activity_df['conversation_time'] = pd.to_datetime(activity_df['conversation_time'])
 
     # Aggregate activity data by date and intention
@@ -227,7 +331,9 @@ def plot_kde_hist_with_activity(df, date_column, activity_df, intention_column,
     fig, ax1 = plt.subplots(figsize=figsize)
 
     # Primary y-axis: Histogram with KDE plot
-    if bins is not None:
+    if daily_counts is not None:
+        _plot_binned_hist_with_kde(daily_counts, ax1, bins=bins, kde=kde)
+    elif bins is not None:
         sns.histplot(df, x=date_column, kde=kde, color='#77B5FE', bins=bins, ax=ax1)
     else:
         sns.histplot(df, x=date_column, kde=kde, color='#77B5FE', ax=ax1)
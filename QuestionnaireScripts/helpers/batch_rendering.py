@@ -0,0 +1,129 @@
+"""
+Headless batch rendering of many charts in parallel worker processes.
+
+A chart spec is a dictionary with the following keys:
+
+* ``function``: The chart function, either a callable or an import path like ``'helpers.likert_charts:plot_likert_response'``.
+* ``kwargs``: Keyword arguments passed to the function (optional).
+* ``path``: The file the chart is saved to.
+* ``rc_params``: rcParams that only apply to this chart (optional).
+* ``figure``: If True, the function draws on a given object-oriented ``matplotlib.figure.Figure``
+  (signature ``function(fig, **kwargs)``) and never touches pyplot. Otherwise the function is one of the
+  pyplot based helpers in this package and is called with ``path`` (or the key given in ``path_argument``).
+* ``figsize``, ``dpi``, ``savefig_kwargs``: Options for figure specs (optional).
+
+Workers always use the Agg backend, apply rcParams and warning filters only while a chart is
+rendered and close the figures of every chart after saving, so rendering hundreds of charts neither
+leaks memory nor needs a display.
+
+Only figure specs are rendered without global state. The existing chart helpers (bar, line, Likert,
+violin and scatter charts) still draw on the current pyplot figure and update ``plt.rcParams``; they
+are safe to batch because every worker is a separate process that renders one spec at a time, and
+the ``rc_context`` restores the rcParams after each spec. Rendering them from several threads of one
+process is not supported.
+"""
+import importlib
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _use_agg_backend():
+    """
+    Force the non-interactive Agg backend in the current process.
+    """
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def _ignore_render_warnings():
+    # Helpers call plt.show(), which only warns on a non-interactive backend, and plot_likert uses deprecated
+    # functions; only applied within the warnings.catch_warnings() of render_chart
+    warnings.filterwarnings('ignore', message='.*non-interactive.*')
+    warnings.filterwarnings('ignore', category=FutureWarning)
+
+
+def resolve_chart_function(function):
+    """
+    Resolve a chart function given as callable or import path.
+
+    :param function: A callable or a string of the form 'package.module:function'.
+    :return: The callable.
+    """
+    if callable(function):
+        return function
+    module_name, _, function_name = function.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def render_chart(spec):
+    """
+    Render a single chart spec with the Agg backend and close its figures afterwards.
+
+    :param spec: The chart spec (see module docstring).
+    :return: The path the chart was saved to.
+    """
+    _use_agg_backend()
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    function = resolve_chart_function(spec['function'])
+    kwargs = dict(spec.get('kwargs', {}))
+    path = spec['path']
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # The warning filters (also those the helpers set) and the rcParams are restored after the chart
+    with warnings.catch_warnings(), matplotlib.rc_context(spec.get('rc_params', {})):
+        _ignore_render_warnings()
+        if spec.get('figure', False):
+            # Object-oriented figure without pyplot: nothing is registered globally
+            fig = Figure(figsize=spec.get('figsize'), dpi=spec.get('dpi'))
+            try:
+                function(fig, **kwargs)
+                fig.savefig(path, **spec.get('savefig_kwargs', {'bbox_inches': 'tight'}))
+            finally:
+                fig.clear()
+        else:
+            import matplotlib.pyplot as plt
+            kwargs[spec.get('path_argument', 'path')] = path
+            # Only the figures of this chart are closed, figures the caller has open stay open
+            open_figures = set(plt.get_fignums())
+            try:
+                function(**kwargs)
+            finally:
+                for number in set(plt.get_fignums()) - open_figures:
+                    plt.close(number)
+
+    return path
+
+
+def render_charts(specs, processes=None, chunksize=1):
+    """
+    Render a list of chart specs in parallel worker processes.
+
+    Workers are started with the 'spawn' method, so they never inherit the (possibly interactive)
+    backend of the calling process, e.g. a Jupyter kernel.
+
+    :param specs: A list of chart specs (see module docstring).
+    :param processes: The number of worker processes (defaults to the number of CPUs). With 0, all
+        charts are rendered in the calling process, which then also switches to the Agg backend; its
+        warning filters, rcParams and already open figures are left as they were.
+    :param chunksize: The number of specs sent to a worker at once.
+    :return: A list with the saved path or the raised exception for every spec, in input order.
+    """
+    if processes == 0:
+        return [_render_safely(spec) for spec in specs]
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=_use_agg_backend) as executor:
+        return list(executor.map(_render_safely, specs, chunksize=chunksize))
+
+
+def _render_safely(spec):
+    # Failing charts must not abort the whole batch; the exception is returned instead
+    try:
+        return render_chart(spec)
+    except Exception as e:
+        return e
@@ -1,9 +1,13 @@
 """
 File to add all functionality to create custom colormaps. 
 """
-import matplotlib.pyplot as plt
-import matplotlib
-import matplotlib.cm
+import re
+from functools import lru_cache
+import numpy as np
+from .lazy_imports import lazy_import
+
+matplotlib = lazy_import('matplotlib')
+mcolors = lazy_import('matplotlib.colors')
 
 custom_color_palettes = {
     "greenvibes": ["#14342B", "#439A86", "#BAB700"],
@@ -30,7 +34,7 @@ custom_color_palettes = {
     "pastel4": ["#B2D8BE", "#F2EBC1", "#D8A4AD"],
     "pastel5": ["#8B9556", "#E1CE7A", "#D8A4AD"],
     "indifferent": ["#566246", "#D8BFAA", "#542344", "#BFD1E5", "#FED894"],
-    "indifferent_pastel": [ "#879970", "#D8BFAA", "##896279", "#BFD1E5","#808080"],
+    "indifferent_pastel": [ "#879970", "#D8BFAA", "#896279", "#BFD1E5","#808080"],
     "powerpoint": ["#7DB182", "#FED894", "#8497B0", "#C9A6B7", "#BFBFBF"],
     "powerpoint_reorder": ["#7DB182", "#C9A6B7", "#8497B0", "#FED894", "#BFBFBF"],
     "powerpoint_reorder_r": ["#C9A6B7", "#7DB182", "#8497B0", "#FED894", "#BFBFBF"],
@@ -39,6 +43,53 @@ custom_color_palettes = {
     "likert_colors": ["#3D0B37", "#c4c2c2", "#304A47"]
 }
 
+HEX_COLOR_PATTERN = re.compile(r'^#[0-9A-Fa-f]{6}$')
+
+@lru_cache(maxsize=1)
+def _get_custom_palettes_rgba():
+    """
+    Parses and validates all custom color palettes once.
+
+    :return: A dictionary mapping each custom palette name to a read-only RGBA array.
+    """
+    palettes = {}
+    for name, colors in custom_color_palettes.items():
+        invalid = [color for color in colors if not HEX_COLOR_PATTERN.match(color)]
+        if invalid:
+            raise ValueError(f"Invalid hex colors in custom palette '{name}': {invalid}")
+        rgba = mcolors.to_rgba_array(colors)
+        rgba.setflags(write=False)
+        palettes[name] = rgba
+    return palettes
+
+@lru_cache(maxsize=256)
+def get_palette_rgba(palette, length=None, first_colors=False):
+    """
+    Returns the resolved colors of a palette as a read-only RGBA array, cached per (palette, length).
+
+    Use the returned array as it is (it cannot be modified) and copy it if changes are needed.
+
+    :param palette: The name of a custom palette or of a colormap from Matplotlib's palettes.
+    :param length: The number of colors. None returns all colors of a custom palette.
+    :param first_colors: If True, the first colors of the palette are taken (recommended for palettes with solid colors).
+        Otherwise the colormap is resampled to the given length, like plt.get_cmap(palette, length); custom
+        palettes are then interpolated into an evenly spaced gradient.
+    :return: A numpy array of shape (length, 4).
+    """
+    custom_palettes = _get_custom_palettes_rgba()
+    if palette in custom_palettes and (first_colors or length is None):
+        rgba = custom_palettes[palette][:length]
+    elif palette in custom_palettes:
+        rgba = _interpolate_colors(custom_palettes[palette], length)
+    elif first_colors:
+        rgba = matplotlib.colormaps[palette](np.arange(length))
+    else:
+        rgba = matplotlib.colormaps[palette].resampled(length)(np.arange(length))
+
+    rgba = np.array(rgba, dtype=float)
+    rgba.setflags(write=False)
+    return rgba
+
 def get_default_colormap(labels, palette='coolwarm'):
     """
     Generates a default colormap for a given set of labels.
@@ -47,11 +98,11 @@ def get_default_colormap(labels, palette='coolwarm'):
     :param palette: The name of a colormap from Matplotlib's palettes. See https://matplotlib.org/stable/users/explain/colors/colormaps.html
     :return: A dictionary mapping each label to a color.
     """
-    # Create a colormap using a set of colors from Matplotlib's palette
-    colormap = plt.cm.get_cmap(palette, len(labels)) 
+    # Resample Matplotlib's palette to the number of labels
+    colors = get_palette_rgba(palette, len(labels)).tolist()
 
     # Assign a color to each label
-    color_map = {label: colormap(i) for i, label in enumerate(labels)}
+    color_map = {label: tuple(colors[i]) for i, label in enumerate(labels)}
 
     return color_map
 
@@ -65,11 +116,12 @@ def get_first_colors_from_palette_as_colorlist(length, palette='tab10'):
     """
 
     if palette in custom_color_palettes:
+        # Validates the hex entries of all custom palettes once
+        _get_custom_palettes_rgba()
         colors = custom_color_palettes[palette]
         return colors[:length]
     
-    cmap = plt.get_cmap(palette) # Get the 'tab10' colormap
-    colors = [cmap(i) for i in range(length)]
+    colors = [tuple(color) for color in get_palette_rgba(palette, length, first_colors=True).tolist()]
 
     return colors
 
@@ -89,11 +141,22 @@ def get_default_colorlist(length, palette='coolwarm'):
     :param palette: The name of a colormap from Matplotlib's palettes. See https://matplotlib.org/stable/users/explain/colors/colormaps.html
     :return: A list of colors.
     """
-    cmap = plt.get_cmap(palette, length)  # You can choose other color maps like 'viridis', 'plasma', etc.
-    colors = [cmap(i) for i in range(length)]
+    # You can choose other color maps like 'viridis', 'plasma', etc.
+    colors = [tuple(color) for color in get_palette_rgba(palette, length).tolist()]
 
     return colors
 
+@lru_cache(maxsize=32)
+def _parse_latex_colors(latex_colors):
+    """
+    Parses \\definecolor{name}{HTML}{XXXXXX} lines once per string.
+
+    :param latex_colors: The LaTeX color definitions, one per line.
+    :return: A tuple of (name, hex color) pairs.
+    """
+    return tuple((define.split("color{")[1].split("}")[0], "#" + define.split("HTML}{")[1].replace("}", "").strip())
+                 for define in latex_colors.split("\n") if define.strip())
+
 def get_colormap_from_latex(latex_colors, latex_colors_to_labels, default_color = "#d6d6d4"):
     colors = []
 
@@ -107,27 +170,88 @@ def get_colormap_from_latex(latex_colors, latex_colors_to_labels, default_color
 
     # latex_col_to_labels = {"codegen": "Code generation", "conceptcomp": "Concept comprehension", "codecomp": "Code comprehension", "bugident": "Bug identification", "docsquery": "Basic prog. knowledge", "testing": "Testing", "coderef": "Code refinement"}
 
-    colors = {latex_colors_to_labels[define.split("color{")[1].split("}")[0]] :  "#" + define.split("HTML}{")[1].replace("}", "") for define in latex_colors.split("\n")}
+    colors = {latex_colors_to_labels[name]: hex_color for name, hex_color in _parse_latex_colors(latex_colors)}
     colors["Other"] = default_color
 
     colors = {key: value for key, value in sorted(colors.items())}
 
     return colors
     
-def blend_hex_colors(hex_color1, hex_color2, percentage):
-    def hex_to_rgb(hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+def hex_colors_to_rgba_array(hex_colors):
+    """
+    Converts hex colors (#RRGGBB or #RRGGBBAA) to RGBA values between 0 and 255.
+
+    :param hex_colors: A hex color string or a list/array of hex color strings.
+    :return: A float array of shape (N, 4).
+    """
+    hex_colors = np.atleast_1d(np.asarray(hex_colors, dtype=str))
+    digits = np.char.lstrip(hex_colors, '#')
+    # Colors without alpha are opaque
+    digits = np.where(np.char.str_len(digits) == 6, np.char.add(digits, 'ff'), digits)
+    values = np.array([int(value, 16) for value in digits], dtype=np.int64)
+    return ((values[:, None] >> np.array([24, 16, 8, 0])) & 255).astype(float)
+
+def _blend_rgba(rgba1, rgba2, weight1):
+    # Weighted sum of two color arrays; weight1 applies to the first colors
+    weight1 = np.asarray(weight1, dtype=float)
+    if weight1.ndim:
+        weight1 = weight1[:, None]
+    return weight1 * rgba1 + (1 - weight1) * rgba2
+
+def blend_hex_colors_array(hex_colors1, hex_colors2, percentages, alpha=False):
+    """
+    Blends arrays of hex colors in one vectorized operation.
+
+    :param hex_colors1: A hex color or a list/array of N hex colors.
+    :param hex_colors2: A hex color or a list/array of N hex colors.
+    :param percentages: The share of hex_colors1 in percent, a single value or N values.
+    :param alpha: If True, the alpha channel is blended and returned, too.
+    :return: A float array of shape (N, 3) or (N, 4) with values between 0 and 1.
+    """
+    rgba1 = hex_colors_to_rgba_array(hex_colors1)
+    rgba2 = hex_colors_to_rgba_array(hex_colors2)
+    weights = np.asarray(percentages, dtype=float) / 100.0
+    rgba1, rgba2 = np.broadcast_arrays(rgba1, rgba2)
+    if weights.ndim:
+        rgba1, rgba2 = (np.broadcast_to(rgba, (len(weights), 4)) for rgba in (rgba1, rgba2))
 
-    def rgb_to_hex(rgb):
-        return '#{:02x}{:02x}{:02x}'.format(*rgb)
+    blended = _blend_rgba(rgba1, rgba2, weights) / 255.0
+    return blended if alpha else blended[:, :3]
 
-    rgb1 = hex_to_rgb(hex_color1)
-    rgb2 = hex_to_rgb(hex_color2)
+def _interpolate_colors(rgba, length):
+    """
+    Interpolates evenly spaced colors between the colors of a palette.
+
+    :param rgba: The palette colors as an array of shape (K, 4).
+    :param length: The number of colors to return.
+    :return: An array of shape (length, 4).
+    """
+    if len(rgba) == 1:
+        return np.repeat(rgba, length, axis=0)
+    stops = np.linspace(0, 1, len(rgba))
+    positions = np.linspace(0, 1, length)
+    # The segment each position falls into and its relative position within that segment
+    segments = np.clip(np.searchsorted(stops, positions, side='right') - 1, 0, len(rgba) - 2)
+    weights = (positions - stops[segments]) / (stops[segments + 1] - stops[segments])
+    return _blend_rgba(rgba[segments + 1], rgba[segments], weights)
+
+def get_listed_colormap(palette, resolution=256, name=None):
+    """
+    Creates a ListedColormap from a custom or Matplotlib palette.
+
+    Custom palettes are interpolated into an evenly spaced gradient through all of their colors.
 
-    weight1 = percentage / 100.0
-    weight2 = 1 - weight1
+    :param palette: The name of a custom palette or of a colormap from Matplotlib's palettes.
+    :param resolution: The number of colors in the colormap.
+    :param name: The name of the colormap, defaults to the palette name.
+    :return: A matplotlib.colors.ListedColormap.
+    """
+    # The cached array is read-only, the colormap gets its own copy
+    return mcolors.ListedColormap(np.array(get_palette_rgba(palette, resolution)), name=name or palette)
 
-    blended_rgb = tuple(int(weight1 * c1 + weight2 * c2) for c1, c2 in zip(rgb1, rgb2))
+def blend_hex_colors(hex_color1, hex_color2, percentage):
+    blended_rgba = _blend_rgba(hex_colors_to_rgba_array(hex_color1), hex_colors_to_rgba_array(hex_color2), percentage / 100.0)
+    # Channels are truncated like int()
+    red, green, blue = blended_rgba[0, :3].astype(int)
 
-    return rgb_to_hex(blended_rgb)
\ No newline at end of file
+    return '#{:02x}{:02x}{:02x}'.format(red, green, blue)
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Deferred imports for heavy plotting dependencies.
+
+``plt = lazy_import('matplotlib.pyplot')`` binds a placeholder module that imports the real module on the
+first attribute access, so importing a helper module does not pay for matplotlib, seaborn or plot_likert
+until a chart is actually drawn.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    A module placeholder that imports the real module on first attribute access.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """
+    Returns a placeholder for a module that is imported when it is first used.
+
+    :param name: The absolute module name, e.g. 'matplotlib.pyplot'.
+    :return: The module if it is already imported, otherwise a LazyModule.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
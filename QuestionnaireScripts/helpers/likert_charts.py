@@ -1,10 +1,14 @@
 
-import plot_likert
 import warnings
-import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 from .colormap_factory import get_default_colorlist
+from .lazy_imports import lazy_import
 import os
 
+plot_likert = lazy_import('plot_likert')
+plt = lazy_import('matplotlib.pyplot')
+
 LIKERT_SCALES = {
     'HELPFUL':  { 
         'likert': ["Not helpful at all", "Not very helpful", "Somewhat helpful", "Helpful", "Very helpful"],
@@ -12,63 +16,201 @@ LIKERT_SCALES = {
         },
     'EXPERIENCE': {
         'likert': ["Very inexperienced", "Inexperienced", "Neither inexperienced nor experienced", "Experienced", "Very experienced"],
-        'legend': ["Very inexperienced", "Very experienced"]
+        'legend': ["Very inexperienced", "Very experienced"],
+        'german': ["sehr unerfahren", "unerfahren", "mittel", "erfahren", "sehr erfahren"]
         },
     'COMPARED': {
         'likert': ["Much worse", "Worse", "Neither worse nor better", "Better", "Much better"],
-        'legend': ["Much worse", "Much better"]
+        'legend': ["Much worse", "Much better"],
+        'german': ["deutlich schlechter", "schlechter", "gleich", "besser", "deutlich besser"]
         },
     'AGREE': {
         'likert': ["Strongly disagree", "Disagree", "Neither agree nor disagree", "Agree", "Strongly agree"],
-        'legend': ["Strongly disagree", "Strongly agree"]
+        'legend': ["Strongly disagree", "Strongly agree"],
+        'german': ["stimme überhaupt nicht zu", "stimme eher nicht zu", "stimme weder zu noch lehne ich ab", "stimme eher zu", "stimme voll zu"]
         },
     'TIME': {
         'likert': ["Daily", "Several times a week", "Several times a month", "Less often", "Never"],
-        'legend': ["Daily", "Never"]
+        'legend': ["Daily", "Never"],
+        'german': ["täglich", "mehrmals pro Woche", "mehrmals pro Monat", "seltener", "nie"]
         }
     }
 
+def get_likert_labels(scale):
+    """
+    Returns the ordered English labels of a Likert scale.
+
+    :param scale: A key of LIKERT_SCALES (e.g. 'AGREE') or a list of labels in scale order.
+    :return: The list of labels.
+    """
+    if isinstance(scale, str):
+        return LIKERT_SCALES[scale]['likert']
+    return list(scale)
+
+def get_likert_lookup(scale):
+    """
+    Builds the lookup table of a Likert scale that maps every accepted response to its code.
+
+    Codes are the 0-based positions in the scale. Accepted responses are the English labels, the
+    German labels (if the scale has any) and the 1-based numeric answers (1 to 5).
+
+    :param scale: A key of LIKERT_SCALES or a list of labels in scale order.
+    :return: A dictionary mapping responses to codes.
+    """
+    labels = get_likert_labels(scale)
+    lookup = {}
+    for code, label in enumerate(labels):
+        lookup[code + 1] = code
+        lookup[label] = code
+    # German labels are also known for label lists that match one of the LIKERT_SCALES
+    german = next((likert['german'] for likert in LIKERT_SCALES.values() if likert['likert'] == labels and 'german' in likert), [])
+    for code, label in enumerate(german):
+        lookup[label] = code
+    return lookup
+
+def encode_likert(column, scale):
+    """
+    Encodes the responses of a question as an ordered categorical with int8 codes.
+
+    The column is translated in a single dictionary lookup. Only exact matches are encoded, all
+    other values (and missing answers) become NaN with code -1. Already encoded columns are
+    re-encoded via their categories only.
+
+    :param column: A pandas Series with German, English or numeric responses.
+    :param scale: A key of LIKERT_SCALES or a list of labels in scale order.
+    :return: A pandas Series with an ordered categorical dtype; .cat.codes holds the int8 codes.
+    """
+    column = pd.Series(column)
+    lookup = get_likert_lookup(scale)
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        category_codes = pd.Series(column.cat.categories).map(lookup).fillna(-1).to_numpy(dtype=np.int8)
+        # Code -1 of the input picks the appended -1
+        codes = np.append(category_codes, np.int8(-1))[column.cat.codes.to_numpy()]
+    else:
+        codes = column.map(lookup).fillna(-1).to_numpy(dtype=np.int8)
+
+    categorical = pd.Categorical.from_codes(codes, categories=get_likert_labels(scale), ordered=True)
+    return pd.Series(categorical, index=column.index, name=column.name)
+
+def encode_likert_frame(df, scale):
+    """
+    Encodes all columns of a response DataFrame, see encode_likert.
+
+    :param df: A pandas DataFrame with one column per question.
+    :param scale: A key of LIKERT_SCALES or a list of labels in scale order.
+    :return: A DataFrame with ordered categorical columns.
+    """
+    return pd.DataFrame({column: encode_likert(df[column], scale) for column in df.columns}, index=df.index)
+
+def get_likert_codes(df, scale):
+    """
+    Returns the int8 codes of a response DataFrame as a matrix (-1 for missing answers).
+
+    :param df: A pandas DataFrame with one column per question (raw or encoded).
+    :param scale: A key of LIKERT_SCALES or a list of labels in scale order.
+    :return: A numpy array of shape (responses, questions) with dtype int8.
+    """
+    codes = np.full((len(df), len(df.columns)), -1, dtype=np.int8)
+    for position, column in enumerate(df.columns):
+        codes[:, position] = encode_likert(df[column], scale).cat.codes.to_numpy()
+    return codes
+
+def get_likert_scores(column, scale):
+    """
+    Converts the responses of a question to the numeric scores 1 to 5, e.g. for medians or averages.
+
+    :param column: A pandas Series with raw or encoded responses.
+    :param scale: A key of LIKERT_SCALES or a list of labels in scale order.
+    :return: A float Series with NaN for missing answers.
+    """
+    codes = encode_likert(column, scale).cat.codes
+    return (codes + 1).where(codes >= 0).astype(float)
+
+def compute_likert_distribution(df, scale):
+    """
+    Counts the responses per question and Likert level with a single np.bincount over the codes.
+
+    The result can be passed to the Likert plotters instead of the responses. Compute it once for
+    all questions and select rows (e.g. distribution.loc[['progExpCompared[CTE]', 'progExpCompared[PE]']])
+    to plot overlapping subsets without recounting.
+
+    :param df: A pandas DataFrame with one column per question (raw or encoded responses).
+    :param scale: A key of LIKERT_SCALES or a list of labels in scale order.
+    :return: A DataFrame of counts with one row per question and one column per Likert level.
+    """
+    labels = get_likert_labels(scale)
+    codes = get_likert_codes(df, scale)
+    n_questions, n_levels = codes.shape[1], len(labels)
+
+    # Offset the codes of every question, so one bincount counts all questions at once
+    flat_codes = codes.astype(np.int64) + np.arange(n_questions) * n_levels
+    counts = np.bincount(flat_codes[codes >= 0], minlength=n_questions * n_levels).reshape(n_questions, n_levels)
+    return pd.DataFrame(counts, index=df.columns, columns=labels)
+
+def compute_likert_percentages(distribution):
+    """
+    Converts a Likert count table to percentages per question.
+
+    :param distribution: The output of compute_likert_distribution.
+    :return: A DataFrame of the same shape with percentages (0 for questions without answers).
+    """
+    totals = distribution.sum(axis=1)
+    return distribution.div(totals.where(totals > 0), axis=0).fillna(0) * 100
+
+def _is_likert_distribution(df, scale):
+    # Response frames have one column per question, count tables one column per Likert level
+    return list(df.columns) == get_likert_labels(scale)
+
+def _translate_likert(column, scale):
+    # Exact matches only, other values are kept as they are
+    translation = dict(zip(LIKERT_SCALES[scale]['german'], LIKERT_SCALES[scale]['likert']))
+    if isinstance(column, str):
+        return translation.get(column, column)
+    translated = column.map(translation)
+    return translated.where(translated.notna(), column)
+
+def _response_rows(columns, distribution):
+    # The number of response rows of a response frame (as len(columns) before); for a count table the most answers of a question
+    if columns is distribution:
+        return int(distribution.to_numpy().sum(axis=1).max(initial=0))
+    return len(columns)
+
 def translate_to_agreeing(column):
-    column = column.replace("stimme voll zu", "Strongly agree").replace("stimme eher zu", "Agree").replace("stimme weder zu noch lehne ich ab", "Neither agree nor disagree").replace("stimme eher nicht zu", "Disagree").replace("stimme überhaupt nicht zu", "Strongly disagree")
-    return column
+    return _translate_likert(column, 'AGREE')
 
 def translate_to_time(column):
-    column = column.replace("täglich", "Daily").replace("mehrmals pro Woche", "Several times a week").replace("mehrmals pro Monat", "Several times a month").replace("seltener", "Less often").replace("nie", "Never")
-    return column
+    return _translate_likert(column, 'TIME')
 
 def translate_to_comparison(column):
-    column = (column.replace("deutlich schlechter", "Much worse")
-        .replace("schlechter", "Worse")
-        .replace("gleich", "Neither worse nor better")
-        .replace("besser", "Better")
-        .replace("deutlich besser", "Much better"))
-    return column
+    return _translate_likert(column, 'COMPARED')
         
 def translate_to_experience(column):
-    column = (column.replace("sehr unerfahren", "Very inexperienced")
-        .replace("unerfahren", "Inexperienced")
-        .replace("mittel", "Neither inexperienced nor experienced")
-        .replace("erfahren", "Experienced")
-        .replace("sehr erfahren", "Very experienced"))
-    return column
+    return _translate_likert(column, 'EXPERIENCE')
 
 def plot_likert_response(columns, column_titles, likert_scale, likert_legend_labels, title, file_path, palette='coolwarm_r'):
     colors = get_default_colorlist(len(likert_scale), palette)
     colors.insert(0, (1.0,1.0,1.0))
     print(colors)
+    # Responses (German, English, numeric or encoded) are counted once; count tables are used as they are
+    if _is_likert_distribution(columns, likert_scale):
+        distribution = columns
+    else:
+        distribution = compute_likert_distribution(columns, likert_scale)
+    n_rows = _response_rows(columns, distribution)
     # plot_likert uses deprecated functions, so we ignore the warnings
     warnings.filterwarnings("ignore", category=FutureWarning)
     
         # Set a fixed width and dynamic height before plotting
     fixed_width = 10  # Fixed width in inches
-    dynamic_height = 0.5 * len(columns)  # Adjust height based on the number of rows
+    dynamic_height = 0.5 * n_rows  # Adjust height based on the number of rows
     plt.figure(figsize=(fixed_width, int(dynamic_height)))
     
     # Plot configuration
     params = {'axes.labelsize': 14.0,'axes.titlesize':14.0, 'font.size': 14.0, 'legend.fontsize': 14.0, 'xtick.labelsize': 14.0, 'ytick.labelsize': 14.0}
     plt.rcParams.update(params)
     
-    ax = plot_likert.plot_likert(columns, likert_scale, plot_percentage=True, colors=colors)
+    ax = plot_likert.plot_counts(distribution, likert_scale, compute_percentages=True, colors=colors)
     ax.figure.set_size_inches(4, 1)
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
@@ -82,8 +224,8 @@ def plot_likert_response(columns, column_titles, likert_scale, likert_legend_lab
     ax.tick_params(axis='y', length=0)
     ax.set_yticklabels(column_titles)
     ax.set_title(title)
-    if len(columns) > 2:
-        height = 0.3 * len(columns.columns)
+    if n_rows > 2:
+        height = 0.3 * len(distribution)
         ax.figure.set_size_inches(4, height)
         
     plt.rcParams['font.size'] = 14.0
@@ -97,13 +239,18 @@ def plot_likert_response_without_text(columns, column_titles, likert_scale, like
     numerical_likert_scale = [1, 2, 3, 4, 5]
     colors = get_default_colorlist(len(numerical_likert_scale), palette)
     colors.insert(0, (1.0, 1.0, 1.0))  # Adding a neutral color for missing data (optional)
+    if _is_likert_distribution(columns, numerical_likert_scale):
+        distribution = columns
+    else:
+        distribution = compute_likert_distribution(columns, numerical_likert_scale)
+    n_rows = _response_rows(columns, distribution)
     
     # Ignore warnings related to deprecated functions
     warnings.filterwarnings("ignore", category=FutureWarning)
 
     # Set a fixed width and dynamic height before plotting
     fixed_width = 10
-    dynamic_height = 0.5 * len(columns)
+    dynamic_height = 0.5 * n_rows
     plt.figure(figsize=(fixed_width, int(dynamic_height)))
 
     # Update plot configuration based on text requirements
@@ -119,7 +266,7 @@ def plot_likert_response_without_text(columns, column_titles, likert_scale, like
         plt.rcParams.update(params)
 
     # Plot using numerical data but display original likert labels
-    ax = plot_likert.plot_likert(columns, numerical_likert_scale, plot_percentage=True, colors=colors)
+    ax = plot_likert.plot_counts(distribution, numerical_likert_scale, compute_percentages=True, colors=colors)
     ax.figure.set_size_inches(4, 1)
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
@@ -143,8 +290,8 @@ def plot_likert_response_without_text(columns, column_titles, likert_scale, like
 
     ax.tick_params(axis='y', length=0)
 
-    if len(columns) > 2:
-        height = 0.3 * len(columns.columns)
+    if n_rows > 2:
+        height = 0.3 * len(distribution)
         ax.figure.set_size_inches(4, height)
 
     if file_path:
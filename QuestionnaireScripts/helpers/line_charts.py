@@ -1,8 +1,10 @@
-import matplotlib.pyplot as plt
 from .colormap_factory import get_first_colors_from_palette_as_colorlist, get_first_colors_from_palette_as_colorlist, get_default_colorlist
-import matplotlib
+from .aggregation import GroupedAggregation, resolve_aggregation
+from .lazy_imports import lazy_import
 import numpy as np
 
+plt = lazy_import('matplotlib.pyplot')
+
 def plot_line_chart(pivot_df, figsize=(10, 6), title=None, path=None, palette='plasma', ylabel='Count', xlabel='Date'):
     """
     Plot a line chart with the DataFrame provided.
@@ -137,26 +139,18 @@ def plot_median_per_group(df, group_column, median_column, figsize=(10, 6), titl
 # Example usage:
 # plot_conversation_length_per_condition(your_dataframe, 'group_column', 'mean_column')
 
-def plot_aggregated_line_chart(df, group_column, aggregate_column, threshold=5, figsize=(10, 6), rotation=90, reorder=None, title=None, path=None, palette='tab10', type='bar', xlabel='', legend_position = 'upper right', ylabel='', define_y_axis = None, columns = None, min_occurences = 0, stacked = False):
+def plot_aggregated_line_chart(df, group_column=None, aggregate_column=None, threshold=5, figsize=(10, 6), rotation=90, reorder=None, title=None, path=None, palette='tab10', type='bar', xlabel='', legend_position = 'upper right', ylabel='', define_y_axis = None, columns = None, min_occurences = 0, stacked = False):
     """
-    Plot an aggregated line chart from a DataFrame.
+    Plot an aggregated line chart from a DataFrame or a GroupedAggregation.
     """
     print(f'x label: {xlabel}')  # Debug statement
     print(f'y label: {ylabel}')  # Debug statement
     
-    # Group by the specified columns and count the occurrences
-    grouped = df.groupby([group_column, aggregate_column]).size().reset_index(name='counts')
-
-    # Sum counts for each group and apply threshold filter for 'others'
-    total_counts = grouped.groupby(group_column)['counts'].sum().reset_index()
-    relevant_groups = total_counts[total_counts['counts'] > threshold][group_column]
-    grouped.loc[~grouped[group_column].isin(relevant_groups), group_column] = 'others'
-
-    # Aggregate again based on updated groupings
-    grouped = grouped.groupby([group_column, aggregate_column]).sum().reset_index()
+    aggregation = resolve_aggregation(df, group_column, aggregate_column)
+    group_column, aggregate_column = aggregation.group_column, aggregation.aggregate_column
 
-    # Pivot the DataFrame for plotting
-    pivot_df = grouped.pivot(index=group_column, columns=aggregate_column, values='counts')
+    # Counts per group and aggregate value, groups with a total count <= threshold are summed into 'others'
+    pivot_df = aggregation.count_pivot(threshold, 'others')
 
     # Filter out columns with all NaN values or a total of less than 15 in the column aggregate_column
     pivot_df = pivot_df.dropna(axis=1, how='all')
@@ -210,23 +204,58 @@ def plot_aggregated_line_chart(df, group_column, aggregate_column, threshold=5,
     plt.show()
     return pivot_df.columns
 
-def plot_percentage_stacked_bar_chart(df, group_column, aggregate_column, reorder=None, group_reorder = None, threshold=5, figsize=(10, 6), rotation=0, title=None, path=None, palette='tab10', xlabel=None, x=0, y=0, fontsize = 12):
-    df[group_column] = df[group_column].astype(str).apply(lambda x: x.replace('_', ' ').capitalize())
+def _draw_text_collection(ax, x, y, labels, fontsize, ha='center', offset=(0, 0), color='black'):
+    """
+    Draw many labels as a single PathCollection instead of one Text artist per label.
+
+    The glyph outlines of every distinct label are built once; the collection places them at
+    the given data coordinates and keeps their size in points, like ax.annotate does.
+
+    :param ax: The axes to draw on.
+    :param x: The x positions in data coordinates.
+    :param y: The y positions in data coordinates.
+    :param labels: The label strings.
+    :param fontsize: The font size in points.
+    :param ha: 'center' or 'left', the horizontal alignment relative to the position.
+    :param offset: Offset of the labels in points (x, y).
+    :param color: The text color.
+    :return: The PathCollection.
+    """
+    from matplotlib.collections import PathCollection
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.path import Path
+    from matplotlib.textpath import TextPath
+    from matplotlib.transforms import Affine2D
+
+    font = FontProperties(size=fontsize)
+    paths = {}
+    for label in set(labels):
+        text_path = TextPath((0, 0), label, prop=font)
+        extents = text_path.get_extents()
+        # Vertically centered, horizontally centered or left aligned (in points)
+        shift_x = offset[0] - (extents.x0 + extents.width / 2 if ha == 'center' else 0)
+        shift_y = offset[1] - (extents.y0 + extents.height / 2)
+        paths[label] = Path(text_path.vertices + [shift_x, shift_y], text_path.codes)
+
+    collection = PathCollection([paths[label] for label in labels], offsets=np.column_stack([x, y]), offset_transform=ax.transData,
+                                transform=Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans,
+                                facecolors=color, edgecolors='none', linewidths=0)
+    # Totals are drawn beside the axes
+    collection.set_clip_on(False)
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+def _format_group_label(label):
+    return str(label).replace('_', ' ').capitalize()
+
+def plot_percentage_stacked_bar_chart(df, group_column=None, aggregate_column=None, reorder=None, group_reorder = None, threshold=5, figsize=(10, 6), rotation=0, title=None, path=None, palette='tab10', xlabel=None, x=0, y=0, fontsize = 12, fast_annotations=False):
+    if not isinstance(df, GroupedAggregation):
+        df[group_column] = df[group_column].astype(str).apply(_format_group_label)
     # print(df[group_column].unique())
+    aggregation = resolve_aggregation(df, group_column, aggregate_column)
 
-    # Group by the specified columns and count the occurrences
-    grouped = df.groupby([group_column, aggregate_column]).size().reset_index(name='counts')
-
-    # Sum counts for each group and apply threshold filter for 'Other'
-    total_counts = grouped.groupby(group_column)['counts'].sum().reset_index()
-    relevant_groups = total_counts[total_counts['counts'] > threshold][group_column]
-    grouped.loc[~grouped[group_column].isin(relevant_groups), group_column] = 'Other'
-
-    # Aggregate again based on updated groupings
-    grouped = grouped.groupby([group_column, aggregate_column]).sum().reset_index()
-
-    # Pivot the DataFrame for plotting
-    pivot_df = grouped.pivot(index=group_column, columns=aggregate_column, values='counts')
+    # Counts per group and aggregate value, groups with a total count <= threshold are summed into 'Other'
+    pivot_df = aggregation.count_pivot(threshold, 'Other', relabel=_format_group_label)
 
     if group_reorder != None:
         # Order group_column based on the reorder list
@@ -247,26 +276,38 @@ def plot_percentage_stacked_bar_chart(df, group_column, aggregate_column, reorde
     # Plotting
     ax = pivot_df_percentage.plot(kind='barh', stacked=True, color=colors, figsize=figsize)
 
-    # Add total values and actual values on the bars
-    for container in ax.containers:
-        for i, rect in enumerate(container):
-            width = rect.get_width()
-            actual_value = pivot_df.iloc[i, ax.containers.index(container)]
-            if width > 0:
-                ax.annotate(f'{int(actual_value)}',
-                            xy=(rect.get_x() + width / 2, rect.get_y() + rect.get_height() / 2),
-                            xytext=(0, 0),
-                            textcoords='offset points',
-                            ha='center', va='center', fontsize=(fontsize-2), color='black')
-
-    # Annotate the total count at the end of each bar
-    for i, (index, row) in enumerate(pivot_df.iterrows()):
-        total = row.sum()
-        ax.annotate(f'{int(total)}',
-                    xy=(100, i),
-                    xytext=(5, 0),
-                    textcoords='offset points',
-                    va='center', ha='left', fontsize=(fontsize-2), color='black')
+    if fast_annotations:
+        # Segment centers from the cumulative percentages (NaN segments are stacked as 0 and not labeled)
+        widths = pivot_df_percentage.fillna(0).to_numpy()
+        centers = np.cumsum(widths, axis=1) - widths / 2
+        rows, columns = np.nonzero(widths > 0)
+        values = pivot_df[pivot_df_percentage.columns].to_numpy()[rows, columns]
+        totals = pivot_df.sum(axis=1).to_numpy()
+
+        _draw_text_collection(ax, centers[rows, columns], rows, [f'{int(value)}' for value in values], fontsize - 2)
+        _draw_text_collection(ax, np.full(len(totals), 100), np.arange(len(totals)), [f'{int(total)}' for total in totals], fontsize - 2,
+                              ha='left', offset=(5, 0))
+    else:
+        # Add total values and actual values on the bars
+        for container in ax.containers:
+            for i, rect in enumerate(container):
+                width = rect.get_width()
+                actual_value = pivot_df.iloc[i, ax.containers.index(container)]
+                if width > 0:
+                    ax.annotate(f'{int(actual_value)}',
+                                xy=(rect.get_x() + width / 2, rect.get_y() + rect.get_height() / 2),
+                                xytext=(0, 0),
+                                textcoords='offset points',
+                                ha='center', va='center', fontsize=(fontsize-2), color='black')
+
+        # Annotate the total count at the end of each bar
+        for i, (index, row) in enumerate(pivot_df.iterrows()):
+            total = row.sum()
+            ax.annotate(f'{int(total)}',
+                        xy=(100, i),
+                        xytext=(5, 0),
+                        textcoords='offset points',
+                        va='center', ha='left', fontsize=(fontsize-2), color='black')
 
     ax.spines['right'].set_visible(False)
     
@@ -295,11 +336,11 @@ def plot_percentage_stacked_bar_chart(df, group_column, aggregate_column, reorde
 
 
 
-def plot_aggregated_sum_line_chart(df, group_column, aggregate_column, mean_column, threshold=5, figsize=(10, 6), rotation=90, title=None, path=None, palette='plasma'):
+def plot_aggregated_sum_line_chart(df, group_column=None, aggregate_column=None, mean_column=None, threshold=5, figsize=(10, 6), rotation=90, title=None, path=None, palette='plasma'):
     """
     Plot an aggregated line chart representing the total sum of a mean_column for a grouped dataframe (group column) per category (aggregate_column).
 
-    :param df: Pandas DataFrame containing the data.
+    :param df: Pandas DataFrame containing the data or a GroupedAggregation with mean_column as value column.
     :param group_column: The column name to group by (similar to 'intention').
     :param aggregate_column: The column name to aggregate on (similar to 'condition_name').
     :param mean_column: The column storing the length of each conversation.
@@ -307,21 +348,11 @@ def plot_aggregated_sum_line_chart(df, group_column, aggregate_column, mean_colu
     :param figsize: Size of the figure (width, height).
     :param rotation: Rotation angle for x-axis labels.
     """
-    # Step 1: Group by the specified columns and sum the lengths
-    grouped = df.groupby([group_column, aggregate_column])[mean_column].sum().reset_index(name='total_length')
+    aggregation = resolve_aggregation(df, group_column, aggregate_column, mean_column)
+    group_column = aggregation.group_column
 
-    # Step 2: Filter and aggregate
-    # Create a mask for summed lengths > threshold
-    mask = grouped.groupby(group_column)['total_length'].transform('sum') > threshold
-
-    # Replace values with low sums with 'others'
-    grouped.loc[~mask, group_column] = 'others'
-
-    # Re-group and sum the lengths after the replacement
-    grouped = grouped.groupby([group_column, aggregate_column]).sum().reset_index()
-
-    # Step 3: Pivot the DataFrame for plotting
-    pivot_df = grouped.pivot(index=group_column, columns=aggregate_column, values='total_length')
+    # Summed lengths per group and category, groups with summed lengths <= threshold are summed into 'others'
+    pivot_df = aggregation.sum_pivot(threshold, 'others')
 
     # Sort the DataFrame based on the total lengths for each category
     pivot_df['total'] = pivot_df.sum(axis=1)
@@ -347,11 +378,11 @@ def plot_aggregated_sum_line_chart(df, group_column, aggregate_column, mean_colu
         plt.savefig(path, bbox_inches='tight')
 import pandas as pd
 
-def plot_average_chart(df, group_column, aggregate_column, data_column, upper_legend=False, colors=None, threshold=5, figsize=(10, 6), rotation=90, title=None, path=None, palette='plasma', reorder = None, xlabel = None, ylabel = None, define_y_axis = None, type='line', reverse=False):
+def plot_average_chart(df, group_column=None, aggregate_column=None, data_column=None, upper_legend=False, colors=None, threshold=5, figsize=(10, 6), rotation=90, title=None, path=None, palette='plasma', reorder = None, xlabel = None, ylabel = None, define_y_axis = None, type='line', reverse=False):
     """
     Plot an aggregated line chart from a DataFrame, averaging the specified data.
 
-    :param df: Pandas DataFrame containing the data.
+    :param df: Pandas DataFrame containing the data or a GroupedAggregation with data_column as value column.
     :param group_column: The column name to group by (e.g., 'intention').
     :param aggregate_column: The column name to aggregate on (e.g., 'condition_name').
     :param data_column: The column containing the data to be averaged.
@@ -359,19 +390,11 @@ def plot_average_chart(df, group_column, aggregate_column, data_column, upper_le
     :param figsize: Size of the figure (width, height).
     :param rotation: Rotation angle for x-axis labels.
     """
-    # Step 1: Group by the specified columns and compute the average
-    grouped = df.groupby([group_column, aggregate_column])[data_column].mean().reset_index(name='average_data')
-
-    # Step 2: Identify groups with a total count less than the threshold and aggregate them into 'others'
-    counts = df[group_column].value_counts()
-    others = counts[counts <= threshold].index
-    grouped[group_column] = grouped[group_column].replace(others, 'others')
+    aggregation = resolve_aggregation(df, group_column, aggregate_column, data_column)
+    group_column, data_column = aggregation.group_column, aggregation.value_column
 
-    # Step 3: Re-group and compute the average again including 'others'
-    grouped = grouped.groupby([group_column, aggregate_column]).mean().reset_index()
-
-    # Step 4: Pivot the DataFrame for plotting
-    pivot_df = grouped.pivot(index=group_column, columns=aggregate_column, values='average_data')
+    # Averages per group and category, groups with <= threshold rows are averaged into 'others'
+    pivot_df = aggregation.mean_pivot(threshold, 'others')
 
     # Sort the DataFrame based on the maximum average for each category
     # pivot_df['max'] = pivot_df.max(axis=1)
@@ -420,11 +443,11 @@ def plot_average_chart(df, group_column, aggregate_column, data_column, upper_le
     if path:
         plt.savefig(path, bbox_inches='tight')
 
-def plot_median_chart(df, group_column, aggregate_column, data_column, threshold=5, figsize=(10, 6), rotation=90, title=None, path=None, palette='plasma', reorder = None, xlabel = None, ylabel = None, define_y_axis = None, type='line'):
+def plot_median_chart(df, group_column=None, aggregate_column=None, data_column=None, threshold=5, figsize=(10, 6), rotation=90, title=None, path=None, palette='plasma', reorder = None, xlabel = None, ylabel = None, define_y_axis = None, type='line'):
     """
     Plot an aggregated line chart from a DataFrame, averaging the specified data.
 
-    :param df: Pandas DataFrame containing the data.
+    :param df: Pandas DataFrame containing the data or a GroupedAggregation with data_column as value column.
     :param group_column: The column name to group by (e.g., 'intention').
     :param aggregate_column: The column name to aggregate on (e.g., 'condition_name').
     :param data_column: The column containing the data to be averaged.
@@ -432,19 +455,11 @@ def plot_median_chart(df, group_column, aggregate_column, data_column, threshold
     :param figsize: Size of the figure (width, height).
     :param rotation: Rotation angle for x-axis labels.
     """
-    # Step 1: Group by the specified columns and compute the average
-    grouped = df.groupby([group_column, aggregate_column])[data_column].median().reset_index(name='average_data')
-
-    # Step 2: Identify groups with a total count less than the threshold and aggregate them into 'others'
-    counts = df[group_column].value_counts()
-    others = counts[counts <= threshold].index
-    grouped[group_column] = grouped[group_column].replace(others, 'others')
-
-    # Step 3: Re-group and compute the average again including 'others'
-    grouped = grouped.groupby([group_column, aggregate_column]).median().reset_index()
+    aggregation = resolve_aggregation(df, group_column, aggregate_column, data_column)
+    group_column, data_column = aggregation.group_column, aggregation.value_column
 
-    # Step 4: Pivot the DataFrame for plotting
-    pivot_df = grouped.pivot(index=group_column, columns=aggregate_column, values='average_data')
+    # Medians per group and category, groups with <= threshold rows are merged into 'others'
+    pivot_df = aggregation.median_pivot(threshold, 'others')
 
     # Sort the DataFrame based on the maximum average for each category
     pivot_df['max'] = pivot_df.max(axis=1)
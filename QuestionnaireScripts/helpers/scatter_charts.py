@@ -1,6 +1,8 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import os
+from .lazy_imports import lazy_import
+
+plt = lazy_import('matplotlib.pyplot')
 
 def plot_scatter(df, x_column, y_column, group_column, figsize=(10, 6), title=None, path=None, palette='tab10', xlabel=None, ylabel=None):
     """
@@ -1,9 +1,11 @@
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 from .colormap_factory import get_first_colors_from_palette_as_colorlist, get_first_colors_from_palette_as_colorlist
-import seaborn as sns
+from .lazy_imports import lazy_import
+
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
 
 def plot_violin_per_group_with_seaborn(df, group_column, value_column, figsize=(10, 6), title=None, path=None, palette='tab10', ylabel='', xlabel='', edge_color='black', median_color='red', mean_color='blue'):
     # Initialize the plot
@@ -60,7 +62,57 @@ def plot_violin_per_group_with_seaborn(df, group_column, value_column, figsize=(
     else:
         plt.show()
 
-def plot_violin_per_group(df, group_column, value_column, figsize=(10, 6), title=None, path=None, palette='tab10', ylabel='', xlabel='', edge_color='black', median_color='red', mean_color='blue', legend=True, yrange = None, legend_loc='upper right', padding_left=""):
+SKETCH_PERCENTILES = [10, 25, 50, 75, 90]
+
+def compute_violin_statistics(df, group_column, value_column, max_points=1000, points=100):
+    """
+    Compute the violin statistics of all groups from a quantile sketch instead of the raw points.
+
+    The groups are built with one groupby. Per group, a single np.percentile call returns the
+    10/25/50/75/90th percentiles together with max_points evenly spaced quantiles (the sketch).
+    The KDE is evaluated on the sketch with the Scott bandwidth of the full group, so the violin
+    keeps the shape it would have with all points. Mean, min and max are exact.
+
+    :param df: Pandas DataFrame containing the data.
+    :param group_column: The column name that is used to group the data.
+    :param value_column: The column with the values.
+    :param max_points: The number of sketch points the KDE is evaluated on per group.
+    :param points: The number of points the KDE is evaluated at.
+    :return: The groups (in order of appearance), the violin statistics for Axes.violin and the percentiles per group.
+    """
+    from matplotlib import mlab
+
+    values = df[value_column].to_numpy(dtype=float)
+    groups = df.groupby(group_column, sort=False, dropna=False).indices
+
+    conditions = list(groups.keys())
+    violin_statistics = []
+    percentiles = []
+    sketch_positions = np.linspace(0, 100, max_points)
+    for condition in conditions:
+        group_values = values[groups[condition]]
+        group_values = group_values[~np.isnan(group_values)]
+
+        quantiles = np.percentile(group_values, np.concatenate([SKETCH_PERCENTILES, sketch_positions]))
+        group_percentiles, sketch = quantiles[:len(SKETCH_PERCENTILES)], quantiles[len(SKETCH_PERCENTILES):]
+        min_val, max_val = sketch[0], sketch[-1]
+
+        coords = np.linspace(min_val, max_val, points)
+        if max_val > min_val:
+            # Scott's bandwidth of the full group instead of the (smaller, less spread) sketch
+            bandwidth = len(group_values) ** (-1. / 5) * np.std(group_values, ddof=1) / np.std(sketch, ddof=1)
+            kde = mlab.GaussianKDE(sketch, bw_method=bandwidth)
+            vals = kde.evaluate(coords)
+        else:
+            vals = np.ones(points)
+
+        violin_statistics.append({'coords': coords, 'vals': vals, 'mean': np.mean(group_values), 'median': group_percentiles[2],
+                                  'min': min_val, 'max': max_val, 'quantiles': []})
+        percentiles.append(group_percentiles)
+
+    return conditions, violin_statistics, percentiles
+
+def plot_violin_per_group(df, group_column, value_column, figsize=(10, 6), title=None, path=None, palette='tab10', ylabel='', xlabel='', edge_color='black', median_color='red', mean_color='blue', legend=True, yrange = None, legend_loc='upper right', padding_left="", max_points=None):
     """
     Plot a violin chart of a value column per group column and include IQR.
 
@@ -76,17 +128,28 @@ def plot_violin_per_group(df, group_column, value_column, figsize=(10, 6), title
     :param edge_color: Color for the edges of the violins.
     :param median_color: Color for the median lines.
     :param mean_color: Color for the mean lines.
+    :param max_points: If set, the violins are drawn from a quantile sketch with this many points per group
+        (see compute_violin_statistics) instead of a KDE over every raw point. Use this for large groups.
     """
     # Prepare the data for plotting
-    conditions = df[group_column].unique()
-    data = [df[df[group_column] == condition][value_column] for condition in conditions]
+    if max_points:
+        conditions, violin_statistics, percentiles = compute_violin_statistics(df, group_column, value_column, max_points)
+        value_max = max(statistics['max'] for statistics in violin_statistics)
+    else:
+        conditions = df[group_column].unique()
+        data = [df[df[group_column] == condition][value_column] for condition in conditions]
+        percentiles = [np.percentile(values, SKETCH_PERCENTILES) for values in data]
+        value_max = max(df[value_column])
 
     # Create the violin plot
     fig, ax = plt.subplots(figsize=figsize)
     # Set the position of the axes to ensure consistent drawing area
     ax.set_position([0.1, 0.1, 0.8, 0.8])  
     
-    parts = ax.violinplot(data, showmeans=True, showmedians=True)
+    if max_points:
+        parts = ax.violin(violin_statistics, positions=np.arange(1, len(conditions) + 1), showmeans=True, showmedians=True)
+    else:
+        parts = ax.violinplot(data, showmeans=True, showmedians=True)
 
     colors = get_first_colors_from_palette_as_colorlist(len(conditions), palette=palette)
     counter = 0
@@ -106,9 +169,7 @@ def plot_violin_per_group(df, group_column, value_column, figsize=(10, 6), title
 
     # Calculate and plot IQR
     for i, condition in enumerate(conditions):
-        quartile1, median, quartile3 = np.percentile(data[i], [25, 50, 75])
-        whisker1 = np.percentile(data[i], 10)
-        whisker3 = np.percentile(data[i], 90)
+        whisker1, quartile1, median, quartile3, whisker3 = percentiles[i]
         ax.plot([i + 1, i + 1], [quartile1, quartile3], color='black', lw=5)
         ax.plot([i + 1, i + 1], [whisker1, whisker3], color='lightblue', lw=1, linestyle='--')
 
@@ -136,10 +197,10 @@ def plot_violin_per_group(df, group_column, value_column, figsize=(10, 6), title
     ax.set_title(title)
     ax.set_ylabel(ylabel or value_column.replace("_", " ").title())
     ax.get_yaxis().set_major_formatter(plt.FuncFormatter(lambda x, loc: "{:,.0f}k".format(x / 1000) if x >= 1000 else "{:,.0f}".format(x)))
-    if max(df[value_column]) < 15:
-        ax.set_yticks(np.arange(0, max(df[value_column])+2, 5))
-    elif max(df[value_column]) < 50:
-        ax.set_yticks(np.arange(0, max(df[value_column])+2, 10))
+    if value_max < 15:
+        ax.set_yticks(np.arange(0, value_max+2, 5))
+    elif value_max < 50:
+        ax.set_yticks(np.arange(0, value_max+2, 10))
     ax.set_xticks(np.arange(1, len(conditions) + 1))
     ax.set_xticklabels(conditions)
     ax.set_xlabel(xlabel or group_column.replace("_", " ").title())
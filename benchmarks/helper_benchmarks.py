@@ -0,0 +1,325 @@
+"""
+Benchmark suite with golden-output checks for the analysis helpers.
+
+Every case runs a helper of AnalysisScripts/helper over seeded synthetic inputs (see synthetic_data.py) at several
+sizes and records the best wall time and the peak memory (tracemalloc) of a call. The output of every call is
+fingerprinted and compared with the fingerprints in golden/helper_outputs.json, which were recorded with the
+reference implementations, so a faster implementation can only be adopted if it returns bit-for-bit the same
+result. In addition, the Cliff's delta effect sizes of the committed AnalysisOutputs/*/metric_calculation_*
+CSVs are recomputed from their bucket columns and must match exactly.
+
+Usage:
+    python benchmarks/helper_benchmarks.py [--repeat 3] [--large] [--cases cliffs] [--output times.json]
+    python benchmarks/helper_benchmarks.py --update-golden   # only after an intended change of the results
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from synthetic_data import generate_commits, person_names
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPOSITORY_ROOT, 'AnalysisScripts'))
+
+from helper.general import aggregate_by_date, generate_rolling_values, generate_value_in_buckets, sort_by_date, split_by_date, truncate_to_same_length  # noqa: E402
+from helper import significance  # noqa: E402
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'helper_outputs.json')
+COMMITTED_OUTPUTS = os.path.join(REPOSITORY_ROOT, 'AnalysisOutputs', '*', 'metric_calculation_*', '*.csv')
+
+START_DATE, INTRO_DATE, END_DATE = '2021-01-01', '2023-01-01', '2024-12-31'
+BUCKETS = 11
+
+
+def commit_frame(size, seed=0):
+    """
+    Returns a synthetic commits.csv frame with size commits (dates as strings, as read from the CSV).
+    """
+    commits, _, _ = generate_commits(np.random.default_rng(seed), size, person_names(5), START_DATE, END_DATE, INTRO_DATE, 1.2, 1)
+    return commits
+
+
+def bucket_frame(repositories, seed=0, buckets=BUCKETS):
+    """
+    Returns a synthetic metric frame in the layout of the notebooks (repository, pre-0..., post-0...) with a few
+    missing buckets, and its pre and post columns.
+    """
+    rng = np.random.default_rng(seed)
+    pre_columns = [f'pre-{i}' for i in range(buckets)]
+    after_columns = [f'post-{i}' for i in range(buckets)]
+    values = rng.lognormal(3, 1, size=(repositories, 2 * buckets))
+    values[:, buckets:] *= rng.lognormal(0.1, 0.2, size=(repositories, 1))
+    values[rng.random(values.shape) < 0.03] = np.nan
+    df = pd.DataFrame(values, columns=pre_columns + after_columns)
+    df.insert(0, 'repository', [f'repository_{i}' for i in range(repositories)])
+    return df, pre_columns, after_columns
+
+
+def _pre_intro_commits(size):
+    # As in the notebooks, the buckets are generated from the (datetime) frames returned by split_by_date
+    return split_by_date(commit_frame(size), INTRO_DATE, 'date')[0].copy()
+
+
+def _normality_inputs(repositories):
+    df, pre_columns, after_columns = bucket_frame(repositories)
+    return significance.check_normality_of_buckets(df, pre_columns, after_columns), df, pre_columns, after_columns
+
+
+def _tied_normality_inputs(repositories):
+    # Eight complete buckets per side (scipy picks the exact test without ties) and rounded buckets (ties) in every
+    # third repository; without NaNs, a single mannwhitneyu call would pick one method for all repositories
+    df, pre_columns, after_columns = bucket_frame(repositories, seed=1, buckets=8)
+    df[pre_columns + after_columns] = df[pre_columns + after_columns].fillna(df[pre_columns + after_columns].mean().mean())
+    df.loc[::3, pre_columns + after_columns] = df.loc[::3, pre_columns + after_columns].round(-1)
+    normality_results = significance.check_normality_of_buckets(df, pre_columns, after_columns)
+    expected = significance.use_normality_results_for_significance_independent(normality_results, df, pre_columns, after_columns, verbose=False)
+    return normality_results, df, pre_columns, after_columns, expected
+
+
+def _independent_batched_with_ties(normality_results, df, pre_columns, after_columns, expected):
+    # The batched test has to return exactly the p-values of the per-repository loop
+    result = significance.use_normality_results_for_significance_independent_batched(normality_results, df, pre_columns, after_columns)
+    for column in ['repository', 'statistic', 'p_value', 'effect_size']:
+        if not np.array_equal(result[column].to_numpy(), expected[column].to_numpy()):
+            raise AssertionError(f'use_normality_results_for_significance_independent_batched differs from the loop in {column}')
+    return result
+
+
+def _tied_paired_inputs(repositories):
+    # Twenty complete pairs per repository, rounded buckets (ties and zero differences) in every third repository
+    # and a single zero difference in every fourth; without NaNs, a single wilcoxon call would pick one method for all
+    df, pre_columns, after_columns = bucket_frame(repositories, seed=2, buckets=20)
+    df[pre_columns + after_columns] = df[pre_columns + after_columns].fillna(df[pre_columns + after_columns].mean().mean())
+    df.loc[::3, pre_columns + after_columns] = df.loc[::3, pre_columns + after_columns].round(-1)
+    df.loc[1::4, after_columns[0]] = df.loc[1::4, pre_columns[0]]
+    normality_results = significance.check_normality_of_buckets(df, pre_columns, after_columns)
+    expected = significance.use_normality_results_for_significance_dependent(normality_results, df, pre_columns, after_columns, verbose=False)
+    return normality_results, df, pre_columns, after_columns, expected
+
+
+def _dependent_batched_with_ties(normality_results, df, pre_columns, after_columns, expected):
+    # The batched tests have to return exactly the statistics and p-values of the per-repository loop
+    result = significance.use_normality_results_for_significance_dependent_batched(normality_results, df, pre_columns, after_columns)
+    for column in ['repository', 'test_used', 'statistic', 'p_value', 'effect_size']:
+        if not np.array_equal(result[column].to_numpy(), expected[column].to_numpy()):
+            raise AssertionError(f'use_normality_results_for_significance_dependent_batched differs from the loop in {column}')
+    return result
+
+
+def _cliffs_delta_with_confidence(df, pre_columns, after_columns):
+    # The bootstrap draws from NumPy's global random state
+    np.random.seed(0)
+    return significance.calculate_cliffs_delta_with_confidence(df, pre_columns, after_columns, n_boot=200)
+
+
+# name: (setup(size) -> arguments, function(*arguments) -> output, default sizes, additional sizes with --large)
+CASES = {
+    'aggregate_by_date': (lambda size: (commit_frame(size), 'date', 'loc_added', 'sum'), aggregate_by_date,
+                          [1000, 10000, 100000], [1000000]),
+    'truncate_to_same_length': (lambda size: (commit_frame(size), INTRO_DATE, 'date', 'defined', '2021-06-01', '2024-06-01'),
+                                truncate_to_same_length, [1000, 10000, 100000], [1000000]),
+    'split_by_date': (lambda size: (commit_frame(size), INTRO_DATE, 'date'), split_by_date, [1000, 10000, 100000], [1000000]),
+    'truncate_to_same_length_presorted': (lambda size: (sort_by_date(commit_frame(size), 'date'), INTRO_DATE, 'date', 'defined', '2021-06-01',
+                                                        '2024-06-01', True), truncate_to_same_length, [1000, 10000, 100000], [1000000]),
+    'truncate_to_same_length_before': (lambda size: (commit_frame(size), INTRO_DATE, 'date', 'before'), truncate_to_same_length,
+                                       [1000, 10000, 100000], [1000000]),
+    'truncate_to_same_length_after': (lambda size: (commit_frame(size), INTRO_DATE, 'date', 'after'), truncate_to_same_length,
+                                      [1000, 10000, 100000], [1000000]),
+    'truncate_to_same_length_before_presorted': (lambda size: (sort_by_date(commit_frame(size), 'date'), INTRO_DATE, 'date', 'before', None, None, True),
+                                                 truncate_to_same_length, [1000, 10000, 100000], [1000000]),
+    'truncate_to_same_length_after_presorted': (lambda size: (sort_by_date(commit_frame(size), 'date'), INTRO_DATE, 'date', 'after', None, None, True),
+                                                truncate_to_same_length, [1000, 10000, 100000], [1000000]),
+    'split_by_date_presorted': (lambda size: (sort_by_date(commit_frame(size), 'date'), INTRO_DATE, 'date', True), split_by_date,
+                                [1000, 10000, 100000], [1000000]),
+    'generate_value_in_buckets': (lambda size: (_pre_intro_commits(size), 'date', 'loc_added', 'sum', 14, 'pre-'), generate_value_in_buckets,
+                                  [1000, 10000, 100000], [1000000]),
+    'generate_rolling_values': (lambda size: (commit_frame(size), 'date', ['loc_added', 'loc_deleted'], 30, ('sum', 'count', 'mean'), '2021-06-01',
+                                               '2024-06-01', INTRO_DATE), generate_rolling_values, [1000, 10000, 100000], [1000000]),
+    'calculate_cliffs_delta': (lambda size: bucket_frame(size), significance.calculate_cliffs_delta, [10, 50, 200], [1000]),
+    'calculate_cliffs_delta_with_confidence': (lambda size: bucket_frame(size), _cliffs_delta_with_confidence, [5, 20], [100]),
+    'check_normality_of_buckets': (lambda size: bucket_frame(size), significance.check_normality_of_buckets, [10, 50, 200], [1000]),
+    'significance_dependent': (lambda size: _normality_inputs(size) + (False, False),
+                               significance.use_normality_results_for_significance_dependent, [10, 50, 200], [1000]),
+    'significance_independent': (lambda size: _normality_inputs(size) + (False,),
+                                 significance.use_normality_results_for_significance_independent, [10, 50, 200], [1000]),
+    'significance_dependent_batched': (lambda size: _normality_inputs(size), significance.use_normality_results_for_significance_dependent_batched,
+                                       [10, 50, 200], [1000]),
+    'significance_independent_batched': (lambda size: _normality_inputs(size), significance.use_normality_results_for_significance_independent_batched,
+                                         [10, 50, 200], [1000]),
+    'significance_dependent_batched_ties': (_tied_paired_inputs, _dependent_batched_with_ties, [10, 50, 200], [1000]),
+    'significance_independent_batched_ties': (_tied_normality_inputs, _independent_batched_with_ties, [10, 50, 200], [1000]),
+    'permutation_test_for_significance': (lambda size: bucket_frame(size) + (True, 'mean', 999), significance.permutation_test_for_significance,
+                                          [10, 50], [200]),
+}
+
+
+def _update_fingerprint(digest, value):
+    if isinstance(value, (tuple, list)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _update_fingerprint(digest, item)
+    elif isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        _update_fingerprint(digest, value.index.to_series())
+        for i in range(value.shape[1]):
+            _update_fingerprint(digest, value.iloc[:, i])
+    elif isinstance(value, pd.Series):
+        digest.update(str(value.dtype).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f'{value.dtype}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode())
+
+
+def fingerprint(value):
+    """
+    Returns a SHA-256 fingerprint of a helper output (DataFrames, Series, arrays and tuples of them), which
+    changes with any value, dtype, column or index difference.
+
+    Parameters:
+        value: The output.
+
+    Returns:
+        str: The hexadecimal fingerprint.
+    """
+    digest = hashlib.sha256()
+    _update_fingerprint(digest, value)
+    return digest.hexdigest()
+
+
+def _copy_arguments(arguments):
+    # Several helpers modify the given frame, so every call gets fresh copies
+    return [argument.copy() if isinstance(argument, pd.DataFrame) else argument for argument in arguments]
+
+
+def run_case(setup, function, size, repeat=3):
+    """
+    Run one case at one size.
+
+    Parameters:
+        setup (callable): Returns the arguments for the given size.
+        function (callable): The helper.
+        size (int): The input size (rows or repositories).
+        repeat (int): The number of timed calls; the best time is reported.
+
+    Returns:
+        dict: The best time in seconds, the peak memory of a call in MiB and the fingerprint of the output.
+    """
+    arguments = setup(size)
+    times = []
+    for _ in range(repeat):
+        copied = _copy_arguments(arguments)
+        start = time.perf_counter()
+        output = function(*copied)
+        times.append(time.perf_counter() - start)
+
+    copied = _copy_arguments(arguments)
+    tracemalloc.start()
+    function(*copied)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': min(times), 'peak_mib': peak / 2 ** 20, 'fingerprint': fingerprint(output)}
+
+
+def check_committed_outputs(pattern=COMMITTED_OUTPUTS):
+    """
+    Recompute the Cliff's delta effect sizes of the committed metric CSVs from their bucket columns.
+
+    Parameters:
+        pattern (str): The glob of the committed metric CSVs.
+
+    Returns:
+        list: A failure message for every file whose recomputed effect sizes are not exactly the committed ones.
+    """
+    failures = []
+    for path in sorted(glob.glob(pattern)):
+        # round_trip parsing, the default parser may be off by one ulp
+        df = pd.read_csv(path, index_col=0, float_precision='round_trip')
+        if 'effect_size' not in df.columns:
+            continue
+        pre_columns = [column for column in df.columns if column.startswith('pre-')]
+        after_columns = [column for column in df.columns if column.startswith('post-')]
+        recomputed = significance.calculate_cliffs_delta(df, pre_columns, after_columns)['effect_size'].to_numpy(dtype=float)
+        if not np.array_equal(recomputed, df['effect_size'].to_numpy(dtype=float), equal_nan=True):
+            failures.append(f"{os.path.relpath(path, REPOSITORY_ROOT)}: recomputed Cliff's delta differs from the committed effect_size")
+    return failures
+
+
+def environment():
+    """
+    Returns the library versions the fingerprints depend on (e.g. the datetime resolution of pandas).
+    """
+    import scipy
+    return {'python': sys.version.split()[0], 'numpy': np.__version__, 'pandas': pd.__version__, 'scipy': scipy.__version__}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analysis helpers and check their outputs against golden fingerprints.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed calls per case and size; the best time is reported.')
+    parser.add_argument('--large', action='store_true', help='Also run the large sizes (no golden fingerprints are recorded for them).')
+    parser.add_argument('--cases', nargs='*', help='Only run cases whose name contains one of these strings.')
+    parser.add_argument('--output', help='Optional JSON file for the measured times and memory.')
+    parser.add_argument('--update-golden', action='store_true', help='Record the current outputs as golden fingerprints.')
+    args = parser.parse_args()
+
+    golden = {'environment': {}, 'outputs': {}}
+    if os.path.exists(GOLDEN_PATH):
+        with open(GOLDEN_PATH) as f:
+            golden = json.load(f)
+
+    results = []
+    failures = []
+    print(f"{'case':<40} {'size':>8} {'seconds':>9} {'peak MiB':>9}  golden")
+    for name, (setup, function, sizes, large_sizes) in CASES.items():
+        if args.cases and not any(part in name for part in args.cases):
+            continue
+        for size in sizes + (large_sizes if args.large else []):
+            result = run_case(setup, function, size, args.repeat)
+            key = f'{name}[{size}]'
+            expected = golden['outputs'].get(key)
+            if args.update_golden and size in sizes:
+                golden['outputs'][key] = result['fingerprint']
+                status = 'recorded'
+            elif expected is None:
+                status = '-'
+            elif expected == result['fingerprint']:
+                status = 'ok'
+            else:
+                status = 'DIFFERENT'
+                failures.append(f'{key} returns a different output than the golden implementation')
+            print(f"{name:<40} {size:>8} {result['seconds']:>9.4f} {result['peak_mib']:>9.1f}  {status}")
+            results.append({'case': name, 'size': size, **result})
+
+    committed_failures = check_committed_outputs()
+    print(f"Committed metric CSVs: {'ok' if not committed_failures else f'{len(committed_failures)} different'}")
+    failures.extend(committed_failures)
+
+    if args.update_golden:
+        golden['environment'] = environment()
+        os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+        with open(GOLDEN_PATH, 'w') as f:
+            json.dump(golden, f, indent=2, sort_keys=True)
+    elif golden['environment'] and golden['environment'] != environment():
+        print(f"Note: the golden fingerprints were recorded with {golden['environment']}; different library versions may change dtypes.")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Cold-start import benchmark for the helper packages.
+
+Every helper module is imported in a fresh interpreter (from the script directory the notebooks run in)
+with ``python -X importtime``. The script reports the cumulative import time of each module and fails if
+
+* a module pulls in one of the heavy dependencies that must only be imported when they are used, or
+* a module cannot be imported (e.g. because an optional dependency is imported eagerly), or
+* a module takes longer than the time budget to import.
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5] [--budget 1.5] [--output import_times.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that are only imported when a function needs them
+DEFERRED_MODULES = ['matplotlib', 'seaborn', 'plot_likert', 'colorspacious', 'scipy', 'sklearn']
+
+# (script directory, module) pairs, imported the same way as in the notebooks
+HELPER_MODULES = [
+    ('AnalysisScripts', 'helper.general'),
+    ('AnalysisScripts', 'helper.significance'),
+    ('AnalysisScripts', 'helper.file_level_store'),
+    ('AnalysisScripts', 'helper.instrumentation'),
+    ('AnalysisScripts', 'helper.placebo'),
+    ('AnalysisScripts', 'helper.difference_in_differences'),
+    ('AggregationScripts', 'helper.results'),
+    ('AggregationScripts', 'helper.multiple_comparisons'),
+    ('AggregationScripts', 'helper.segmented_regression'),
+    ('AggregationScripts', 'helper.meta_analysis'),
+    ('AggregationScripts', 'helper.power_analysis'),
+    ('QuestionnaireScripts', 'helpers'),
+    ('QuestionnaireScripts', 'helpers.aggregation'),
+    ('QuestionnaireScripts', 'helpers.bar_charts'),
+    ('QuestionnaireScripts', 'helpers.batch_rendering'),
+    ('QuestionnaireScripts', 'helpers.colormap_factory'),
+    ('QuestionnaireScripts', 'helpers.display_colormap_gradients'),
+    ('QuestionnaireScripts', 'helpers.helpers'),
+    ('QuestionnaireScripts', 'helpers.likert_charts'),
+    ('QuestionnaireScripts', 'helpers.line_charts'),
+    ('QuestionnaireScripts', 'helpers.scatter_charts'),
+    ('QuestionnaireScripts', 'helpers.violin_plots'),
+]
+
+# A plain import statement, importlib.import_module is not covered by -X importtime
+CHECK_CODE = """
+import {module}
+import json, sys
+loaded = sorted({{name.split('.')[0] for name in sys.modules}} & set({deferred!r}))
+print(json.dumps(loaded))
+"""
+
+
+def parse_import_time(stderr, module):
+    """
+    Extract the cumulative import time of a module from the output of python -X importtime.
+
+    Parameters:
+        stderr (str): The stderr of the interpreter.
+        module (str): The imported module.
+
+    Returns:
+        float: The cumulative import time in seconds (NaN if the module is not listed).
+    """
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    return float('nan')
+
+
+def measure_import(directory, module, repeat=5):
+    """
+    Import a module in fresh interpreters and return the best cumulative import time.
+
+    Parameters:
+        directory (str): The script directory relative to the repository root.
+        module (str): The module to import.
+        repeat (int): The number of fresh interpreters.
+
+    Returns:
+        dict: The module, its best import time in seconds and the deferred modules it loaded.
+    """
+    code = CHECK_CODE.format(module=module, deferred=DEFERRED_MODULES)
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=os.path.join(REPOSITORY_ROOT, directory),
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'unknown error'
+            return {'directory': directory, 'module': module, 'seconds': float('nan'), 'loaded': [], 'error': error}
+        times.append(parse_import_time(completed.stderr, module))
+        loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    return {'directory': directory, 'module': module, 'seconds': min(times), 'loaded': loaded, 'error': None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cold-start import time of the helper packages.')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per module; the best time is reported.')
+    parser.add_argument('--budget', type=float, default=1.5, help='Maximum cumulative import time per module in seconds.')
+    parser.add_argument('--output', help='Optional JSON file for the measured times.')
+    args = parser.parse_args()
+
+    results = [measure_import(directory, module, args.repeat) for directory, module in HELPER_MODULES]
+
+    failures = []
+    print(f"{'module':<56} {'seconds':>8}  deferred modules loaded")
+    for result in results:
+        name = f"{result['directory']}/{result['module']}"
+        if result['error']:
+            # A helper must be importable even if an optional plotting dependency is missing
+            print(f"{name:<56} {'-':>8}  {result['error']}")
+            failures.append(f"{name} cannot be imported: {result['error']}")
+            continue
+        print(f"{name:<56} {result['seconds']:>8.3f}  {', '.join(result['loaded']) or '-'}")
+        if result['loaded']:
+            failures.append(f"{name} imports {', '.join(result['loaded'])} at import time")
+        if result['seconds'] > args.budget:
+            failures.append(f"{name} takes {result['seconds']:.3f}s to import (budget {args.budget}s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+"""
+Seeded generator for synthetic repository data.
+
+Writes one directory per repository with the files the analysis scripts read (see AnalysisScripts/README.adoc):
+
+* ``commits.csv`` - sha, author, date, message, loc_added, loc_deleted
+* ``pull_requests.csv`` - sha, author, merged_by, title, description, requested_reviewers, assignees, state,
+  created_at, time_until_merged, time_until_closed (durations as ``days:hours:minutes:seconds``)
+* ``releases.csv`` - tag, author, message, date
+* ``branches.csv`` - branch_name, created_by, last_author, commits (list of shas)
+* ``workflow_runs.csv`` - name, author, status, conclusion, created_at
+* ``files.json`` - file level changes per commit (commit_sha, commit_files)
+
+and a ``mapping.json`` with the START_DATE, INTRO_DATE and END_DATE of every repository. Commit activity follows
+a weekly pattern and changes by a configurable factor after the introduction date, so the pre/post comparisons
+of the notebooks have something to find. Every repository draws from its own child seed, so a repository's data
+only depends on the seed, its position and the per-repository knobs, not on the number of repositories.
+
+Usage:
+    python benchmarks/synthetic_data.py OUTPUT_DIRECTORY [--repositories 10] [--persons 20] [--commits 1000]
+        [--files-per-commit 3] [--start-date 2021-01-01] [--end-date 2024-12-31] [--seed 0]
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+FILE_TYPES = ['py', 'ts', 'js', 'java', 'kt', 'md', 'json', 'yml', 'css', 'html']
+FILE_TYPE_WEIGHTS = [0.25, 0.2, 0.12, 0.1, 0.05, 0.08, 0.07, 0.05, 0.04, 0.04]
+WEEKDAY_WEIGHTS = [1.0, 1.05, 1.05, 1.0, 0.85, 0.15, 0.1]
+WORKFLOW_NAMES = ['CI', 'Build', 'Lint', 'Deploy']
+MESSAGE_WORDS = ['fix', 'add', 'update', 'refactor', 'remove', 'test', 'docs', 'parser', 'api', 'ui', 'config',
+                 'build', 'cache', 'login', 'export', 'import', 'model', 'view', 'service', 'query']
+
+
+def person_names(persons):
+    """
+    Returns zero-padded person names, so no name is a substring of another (separate_into_participants.py
+    matches persons by substring).
+
+    Parameters:
+        persons (int): The number of persons.
+
+    Returns:
+        np.ndarray: The person names.
+    """
+    width = len(str(persons))
+    return np.array([f'person_{i:0{width}d}x' for i in range(persons)])
+
+
+def random_shas(rng, n):
+    """
+    Returns n random 40 character hexadecimal commit shas.
+    """
+    return np.frombuffer(rng.bytes(20 * n).hex().encode(), dtype='S40').astype(str)
+
+
+def random_messages(rng, n, words=3):
+    """
+    Returns n short commit messages made of random words.
+    """
+    choices = rng.choice(MESSAGE_WORDS, size=(n, words))
+    return pd.Series(choices[:, 0]).str.cat([pd.Series(choices[:, i]) for i in range(1, words)], sep=' ').to_numpy()
+
+
+def random_dates(rng, n, start_date, end_date, intro_date=None, effect=1.0):
+    """
+    Draw n sorted timestamps between start_date and end_date with a weekly activity pattern. After intro_date,
+    the activity is multiplied by effect.
+
+    Parameters:
+        rng (np.random.Generator): The random generator.
+        n (int): The number of timestamps.
+        start_date (str): The first day (YYYY-MM-DD).
+        end_date (str): The last day (YYYY-MM-DD).
+        intro_date (str): The introduction date (optional).
+        effect (float): The activity factor after the introduction date.
+
+    Returns:
+        pd.DatetimeIndex: The sorted UTC timestamps.
+    """
+    days = pd.date_range(start_date, end_date, freq='D', tz='UTC')
+    weights = np.asarray(WEEKDAY_WEIGHTS)[days.dayofweek]
+    if intro_date is not None:
+        weights = np.where(days >= pd.Timestamp(intro_date, tz='UTC'), weights * effect, weights)
+    day_index = np.sort(rng.choice(len(days), size=n, p=weights / weights.sum()))
+    # Working hours are more likely than the night
+    seconds = np.clip(rng.normal(14 * 3600, 3.5 * 3600, size=n), 0, 86399).astype(np.int64)
+    order = np.lexsort((seconds, day_index))
+    return days[day_index[order]] + pd.to_timedelta(seconds[order], unit='s')
+
+
+def format_durations(seconds):
+    """
+    Format durations in seconds as 'days:hours:minutes:seconds' strings (NaN stays empty).
+    """
+    seconds = pd.Series(seconds)
+    valid = seconds.notna()
+    total = seconds[valid].astype(np.int64)
+    formatted = pd.Series(np.nan, index=seconds.index, dtype=object)
+    formatted[valid] = ((total // 86400).astype(str) + ':' + (total % 86400 // 3600).astype(str) + ':'
+                        + (total % 3600 // 60).astype(str) + ':' + (total % 60).astype(str))
+    return formatted.to_numpy()
+
+
+def generate_file_changes(rng, n_commits, files_per_commit=3, file_pool=500):
+    """
+    Generate the file level changes of n_commits commits.
+
+    Parameters:
+        rng (np.random.Generator): The random generator.
+        n_commits (int): The number of commits.
+        files_per_commit (float): The mean number of changed files per commit (at least one).
+        file_pool (int): The number of distinct files in the repository.
+
+    Returns:
+        tuple: The number of changed files per commit (np.ndarray) and a DataFrame with one row per changed file
+        (file_path, loc_added, loc_removed, calculated_loc_added, calculated_loc_removed, calculated_loc_changed,
+        line_count).
+    """
+    files = 1 + rng.poisson(max(files_per_commit - 1, 0), size=n_commits)
+    n = int(files.sum())
+
+    file_types = rng.choice(FILE_TYPES, size=file_pool, p=FILE_TYPE_WEIGHTS)
+    paths = np.array([f'src/module_{i // 20}/file_{i}.{file_type}' for i, file_type in enumerate(file_types)])
+    sizes = np.maximum(rng.lognormal(4.5, 1.2, size=file_pool).astype(np.int64), 1)
+    file_index = rng.integers(0, file_pool, size=n)
+
+    line_count = sizes[file_index]
+    loc_added = rng.negative_binomial(1, 0.05, size=n)
+    loc_removed = np.minimum(rng.negative_binomial(1, 0.1, size=n), line_count)
+    # The manually parsed diff counts modified lines separately
+    calculated_loc_changed = np.minimum(rng.binomial(loc_added, 0.3), loc_removed)
+    changes = pd.DataFrame({
+        'file_path': paths[file_index],
+        'loc_added': loc_added,
+        'loc_removed': loc_removed,
+        'calculated_loc_added': loc_added - calculated_loc_changed,
+        'calculated_loc_removed': loc_removed - calculated_loc_changed,
+        'calculated_loc_changed': calculated_loc_changed,
+        'line_count': np.where(rng.random(n) < 0.01, 0, line_count + loc_added - loc_removed),
+    })
+    return files, changes
+
+
+def generate_commits(rng, n_commits, persons, start_date, end_date, intro_date=None, effect=1.0, files_per_commit=3):
+    """
+    Generate the commits of a repository and their file level changes.
+
+    Parameters:
+        rng (np.random.Generator): The random generator.
+        n_commits (int): The number of commits.
+        persons (np.ndarray): The names of the persons working on the repository.
+        start_date (str): The first day (YYYY-MM-DD).
+        end_date (str): The last day (YYYY-MM-DD).
+        intro_date (str): The introduction date (optional).
+        effect (float): The activity factor after the introduction date.
+        files_per_commit (float): The mean number of changed files per commit.
+
+    Returns:
+        tuple: The commits DataFrame (in the schema of commits.csv), the number of changed files per commit and the
+        file level changes (see generate_file_changes).
+    """
+    dates = random_dates(rng, n_commits, start_date, end_date, intro_date, effect)
+    # Some persons commit much more than others
+    activity = rng.pareto(1.5, size=len(persons)) + 1
+    files, changes = generate_file_changes(rng, n_commits, files_per_commit)
+    commit_index = np.repeat(np.arange(n_commits), files)
+
+    commits = pd.DataFrame({
+        'sha': random_shas(rng, n_commits),
+        'author': rng.choice(persons, size=n_commits, p=activity / activity.sum()),
+        'date': dates.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+        'message': random_messages(rng, n_commits),
+        'loc_added': np.bincount(commit_index, weights=changes['loc_added'], minlength=n_commits).astype(np.int64),
+        'loc_deleted': np.bincount(commit_index, weights=changes['loc_removed'], minlength=n_commits).astype(np.int64),
+    })
+    return commits, files, changes
+
+
+def generate_pull_requests(rng, commits, persons, ratio=0.1):
+    """
+    Generate pull requests merged by (or closed before) random commits of the repository.
+
+    Parameters:
+        rng (np.random.Generator): The random generator.
+        commits (pd.DataFrame): The commits of the repository.
+        persons (np.ndarray): The names of the persons working on the repository.
+        ratio (float): The number of pull requests per commit.
+
+    Returns:
+        pd.DataFrame: The pull requests (in the schema of pull_requests.csv).
+    """
+    n = max(int(len(commits) * ratio), 1)
+    commit_index = rng.integers(0, len(commits), size=n)
+    state = rng.choice(['MERGED', 'CLOSED', 'OPEN'], size=n, p=[0.75, 0.15, 0.1])
+    # Hours until the pull request is merged or closed, heavy tailed
+    duration = rng.lognormal(3, 1.5, size=n) * 3600
+    created_at = pd.to_datetime(commits['date'].to_numpy()[commit_index], utc=True) - pd.to_timedelta(duration, unit='s')
+
+    merged = state == 'MERGED'
+    until_merged = np.where(merged, duration, np.nan)
+    until_closed = np.where(state != 'OPEN', duration, np.nan)
+    authors = commits['author'].to_numpy()[commit_index]
+    reviewers = rng.choice(persons, size=n)
+    return pd.DataFrame({
+        'sha': np.where(merged, commits['sha'].to_numpy()[commit_index], ''),
+        'author': authors,
+        'merged_by': np.where(merged, reviewers, ''),
+        'title': random_messages(rng, n, 4),
+        'description': random_messages(rng, n, 8),
+        'requested_reviewers': reviewers,
+        'assignees': authors,
+        'state': state,
+        'created_at': created_at.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+        'time_until_merged': format_durations(until_merged),
+        'time_until_closed': format_durations(until_closed),
+    })
+
+
+def generate_branches(rng, commits, persons, n_branches, max_commits=30):
+    """
+    Generate branches that each contain a run of consecutive commits.
+
+    Parameters:
+        rng (np.random.Generator): The random generator.
+        commits (pd.DataFrame): The commits of the repository.
+        persons (np.ndarray): The names of the persons working on the repository.
+        n_branches (int): The number of branches.
+        max_commits (int): The maximum number of commits per branch.
+
+    Returns:
+        pd.DataFrame: The branches (in the schema of branches.csv).
+    """
+    shas = commits['sha'].to_numpy()
+    lengths = rng.integers(1, max_commits + 1, size=n_branches)
+    starts = rng.integers(0, max(len(shas) - max_commits, 1), size=n_branches)
+    return pd.DataFrame({
+        'branch_name': [f'feature/{i}-{word}' for i, word in enumerate(rng.choice(MESSAGE_WORDS, size=n_branches))],
+        'created_by': rng.choice(persons, size=n_branches),
+        'last_author': rng.choice(persons, size=n_branches),
+        'commits': [str(list(shas[start:start + length])) for start, length in zip(starts, lengths)],
+    })
+
+
+def generate_releases(rng, persons, start_date, end_date, interval=30):
+    """
+    Generate releases roughly every interval days.
+    """
+    n = max(int((pd.Timestamp(end_date) - pd.Timestamp(start_date)).days / interval), 1)
+    dates = random_dates(rng, n, start_date, end_date)
+    minor = np.arange(n)
+    return pd.DataFrame({
+        'tag': [f'v{m // 10 + 1}.{m % 10}.0' for m in minor],
+        'author': rng.choice(persons, size=n),
+        'message': random_messages(rng, n),
+        'date': dates.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+    })
+
+
+def generate_workflow_runs(rng, commits, runs_per_commit=0.5):
+    """
+    Generate workflow runs triggered by random commits.
+    """
+    n = int(len(commits) * runs_per_commit)
+    commit_index = np.sort(rng.integers(0, len(commits), size=n))
+    return pd.DataFrame({
+        'name': rng.choice(WORKFLOW_NAMES, size=n),
+        'author': commits['author'].to_numpy()[commit_index],
+        'status': 'completed',
+        'conclusion': rng.choice(['success', 'failure', 'cancelled'], size=n, p=[0.85, 0.12, 0.03]),
+        'created_at': commits['date'].to_numpy()[commit_index],
+    })
+
+
+def write_files_json(path, shas, files, changes, chunk_size=100000):
+    """
+    Write the file level changes as files.json, streaming chunks of commits so millions of commits fit in memory.
+
+    Parameters:
+        path (str): The output file.
+        shas (np.ndarray): The commit shas.
+        files (np.ndarray): The number of changed files per commit.
+        changes (pd.DataFrame): The file level changes (see generate_file_changes), ordered by commit.
+        chunk_size (int): The number of commits per chunk.
+    """
+    offsets = np.concatenate([[0], np.cumsum(files)])
+    columns = list(changes.columns)
+    with open(path, 'w') as f:
+        f.write('[')
+        for start in range(0, len(shas), chunk_size):
+            stop = min(start + chunk_size, len(shas))
+            rows = changes.iloc[offsets[start]:offsets[stop]]
+            records = [dict(zip(columns, row)) for row in zip(*(rows[column].tolist() for column in columns))]
+            items = []
+            for i in range(start, stop):
+                commit_files = records[offsets[i] - offsets[start]:offsets[i + 1] - offsets[start]]
+                items.append(json.dumps({'commit_sha': shas[i], 'commit_files': commit_files}))
+            f.write((',' if start else '') + ','.join(items))
+        f.write(']')
+
+
+def generate_repository(directory, rng, persons, n_commits, start_date, end_date, intro_date, effect=1.2, files_per_commit=3,
+                        write_files=True):
+    """
+    Generate and write all files of one repository.
+
+    Parameters:
+        directory (str): The repository directory.
+        rng (np.random.Generator): The random generator of this repository.
+        persons (np.ndarray): The names of the persons working on the repository.
+        n_commits (int): The number of commits.
+        start_date (str): The first day (YYYY-MM-DD).
+        end_date (str): The last day (YYYY-MM-DD).
+        intro_date (str): The introduction date (YYYY-MM-DD).
+        effect (float): The activity factor after the introduction date.
+        files_per_commit (float): The mean number of changed files per commit.
+        write_files (bool): Whether to write files.json.
+
+    Returns:
+        dict: The number of rows written per file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    commits, files, changes = generate_commits(rng, n_commits, persons, start_date, end_date, intro_date, effect, files_per_commit)
+    tables = {
+        'commits.csv': commits,
+        'pull_requests.csv': generate_pull_requests(rng, commits, persons),
+        'releases.csv': generate_releases(rng, persons, start_date, end_date),
+        'branches.csv': generate_branches(rng, commits, persons, max(n_commits // 50, 1)),
+        'workflow_runs.csv': generate_workflow_runs(rng, commits),
+    }
+    for filename, table in tables.items():
+        table.to_csv(os.path.join(directory, filename), index=False)
+
+    rows = {filename: len(table) for filename, table in tables.items()}
+    if write_files:
+        write_files_json(os.path.join(directory, 'files.json'), commits['sha'].to_numpy(), files, changes)
+        rows['files.json'] = len(changes)
+    return rows
+
+
+def generate_repositories(output_directory, repositories=10, persons=20, commits_per_repository=1000, files_per_commit=3,
+                          start_date='2021-01-01', end_date='2024-12-31', intro_date=None, effect=1.2, persons_per_repository=5,
+                          seed=0, write_files=True):
+    """
+    Generate a directory tree of synthetic repositories and its mapping.json.
+
+    Parameters:
+        output_directory (str): The storage directory (one subdirectory per repository).
+        repositories (int): The number of repositories.
+        persons (int): The number of distinct persons across all repositories.
+        commits_per_repository (int): The number of commits per repository.
+        files_per_commit (float): The mean number of changed files per commit.
+        start_date (str): The first day (YYYY-MM-DD).
+        end_date (str): The last day (YYYY-MM-DD).
+        intro_date (str): The introduction date; by default every repository gets its own date in the middle half of the span.
+        effect (float): The activity factor after the introduction date.
+        persons_per_repository (int): The number of persons working on each repository.
+        seed (int): The seed.
+        write_files (bool): Whether to write files.json (the largest file by far).
+
+    Returns:
+        dict: The number of rows written per repository and file.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    names = person_names(persons)
+    span = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days
+    mapping = {}
+    rows = {}
+    for index, child in enumerate(np.random.SeedSequence(seed).spawn(repositories)):
+        rng = np.random.default_rng(child)
+        repository = f'repository_{index:0{len(str(repositories))}d}'
+        repository_persons = rng.choice(names, size=min(persons_per_repository, persons), replace=False)
+        repository_intro = intro_date or (pd.Timestamp(start_date) + pd.Timedelta(days=int(rng.integers(span // 4, 3 * span // 4 + 1)))).strftime('%Y-%m-%d')
+        mapping[repository] = {'SYNONYM': f'Repository {index}', 'START_DATE': start_date, 'INTRO_DATE': repository_intro, 'END_DATE': end_date}
+        rows[repository] = generate_repository(os.path.join(output_directory, repository), rng, repository_persons, commits_per_repository,
+                                               start_date, end_date, repository_intro, effect, files_per_commit, write_files)
+
+    with open(os.path.join(output_directory, 'mapping.json'), 'w') as f:
+        json.dump(mapping, f, indent=4)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic repository data for load testing the analysis scripts.')
+    parser.add_argument('output_directory', help='The storage directory the repositories are written to.')
+    parser.add_argument('--repositories', type=int, default=10, help='Number of repositories.')
+    parser.add_argument('--persons', type=int, default=20, help='Number of distinct persons across all repositories.')
+    parser.add_argument('--persons-per-repository', type=int, default=5, help='Number of persons working on each repository.')
+    parser.add_argument('--commits', type=int, default=1000, help='Commits per repository.')
+    parser.add_argument('--files-per-commit', type=float, default=3, help='Mean number of changed files per commit.')
+    parser.add_argument('--start-date', default='2021-01-01', help='First day of the data (YYYY-MM-DD).')
+    parser.add_argument('--end-date', default='2024-12-31', help='Last day of the data (YYYY-MM-DD).')
+    parser.add_argument('--intro-date', help='Introduction date for all repositories (default: a random date per repository).')
+    parser.add_argument('--effect', type=float, default=1.2, help='Commit activity factor after the introduction date.')
+    parser.add_argument('--no-files', action='store_true', help='Do not write files.json.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generator.')
+    args = parser.parse_args()
+
+    rows = generate_repositories(args.output_directory, args.repositories, args.persons, args.commits, args.files_per_commit,
+                                 args.start_date, args.end_date, args.intro_date, args.effect, args.persons_per_repository,
+                                 args.seed, not args.no_files)
+    total = pd.DataFrame(rows).T.sum()
+    print(f"Wrote {len(rows)} repositories to {args.output_directory}: " + ', '.join(f'{name} {int(count)} rows' for name, count in total.items()))
+
+
+if __name__ == '__main__':
+    main()